@@ -1 +1,12 @@
-from .core import define_aoi, epoch_data, plot_as_scatter, percent_data_in_aoi, overlay_aoi, plot_heatmap
\ No newline at end of file
+from .core import define_aoi, epoch_data, plot_as_scatter, percent_data_in_aoi, overlay_aoi, plot_heatmap, aoi_hits, compact_data
+from .core import AOIGridIndex, label_aoi
+from .core import dynamic_aoi_hits, percent_data_in_dynamic_aoi
+from .core import data_quality_metrics, pixels_per_degree
+from .core import binocular_summary, combine_eyes
+from .core import aoi_visits, scanpath_metrics
+from .core import prefetch_recordings, read_edf
+from .core import Pipeline, content_hash
+from .core import GazeIntegralImage
+from .core import resample_data, resample_chunks
+from .core import build_report, read_samples
+from .core import OnlineQC, socket_samples
\ No newline at end of file
@@ -1,3 +1,14 @@
-from .processing import define_aoi, epoch_data, percent_data_in_aoi
+from .processing import define_aoi, epoch_data, percent_data_in_aoi, aoi_hits, compact_data
 from ._utility import aoi_mask_validation, dataframe_validation
 from .plotting import plot_as_scatter, overlay_aoi, plot_heatmap
+from .spatial import AOIGridIndex, label_aoi
+from .dynamic import dynamic_aoi_hits, percent_data_in_dynamic_aoi
+from .quality import data_quality_metrics, pixels_per_degree
+from .binocular import binocular_summary, combine_eyes
+from .scanpath import aoi_visits, scanpath_metrics
+from .loading import prefetch_recordings, read_edf
+from .pipeline import Pipeline, content_hash
+from .integral import GazeIntegralImage
+from .resampling import resample_data, resample_chunks
+from .report import build_report, read_samples
+from .online import OnlineQC, socket_samples
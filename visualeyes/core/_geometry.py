@@ -0,0 +1,303 @@
+import numpy as np
+
+def points_in_rectangle(x, y, x1, x2, y1, y2):
+    '''
+    Test which points fall inside a rectangle, upper-bounds non-inclusive.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Coordinates of the points
+    x1, x2, y1, y2 : int/float or numpy.ndarray
+        Rectangle bounds, broadcastable against x and y
+
+    Returns:
+    --------
+    inside : numpy.ndarray of bool
+        True for every point inside the rectangle
+    '''
+
+    return (x >= x1) & (x < x2) & (y >= y1) & (y < y2)
+
+
+def points_in_circle(x, y, x_center, y_center, radius):
+    '''
+    Test which points fall inside (or on the boundary of) a circle.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Coordinates of the points
+    x_center, y_center, radius : int/float or numpy.ndarray
+        Circle parameters, broadcastable against x and y
+
+    Returns:
+    --------
+    inside : numpy.ndarray of bool
+        True for every point inside the circle
+    '''
+
+    return (x - x_center)**2 + (y - y_center)**2 <= radius**2
+
+
+def points_in_ellipse(x, y, x_center, y_center, semi_axis_x, semi_axis_y, angle=0):
+    '''
+    Test which points fall inside (or on the boundary of) a rotated ellipse.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Coordinates of the points
+    x_center, y_center : int/float or numpy.ndarray
+        Center of the ellipse
+    semi_axis_x, semi_axis_y : int/float or numpy.ndarray
+        Semi-axes of the ellipse before rotation
+    angle : int/float or numpy.ndarray, optional
+        Rotation of the ellipse in degrees
+
+    Returns:
+    --------
+    inside : numpy.ndarray of bool
+        True for every point inside the ellipse
+    '''
+
+    theta = np.deg2rad(angle)
+    cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+
+    # rotate the points into the frame of the ellipse
+    dx = x - x_center
+    dy = y - y_center
+    u = dx * cos_theta + dy * sin_theta
+    v = -dx * sin_theta + dy * cos_theta
+
+    return (u / semi_axis_x)**2 + (v / semi_axis_y)**2 <= 1
+
+
+def points_in_polygon(x, y, vertices):
+    '''
+    Test which points fall inside a polygon using the even-odd ray-casting rule.
+
+    The loop runs over the polygon edges only; every iteration is vectorized over all points.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Coordinates of the points
+    vertices : numpy.ndarray
+        Polygon vertices, shape (n_vertices, 2), or (n_points, n_vertices, 2)
+        for a different polygon per point
+
+    Returns:
+    --------
+    inside : numpy.ndarray of bool
+        True for every point inside the polygon
+    '''
+
+    vertices = np.asarray(vertices, dtype=float)
+    vx, vy = vertices[..., 0], vertices[..., 1]
+    n_vertices = vertices.shape[-2]
+
+    inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+
+    for i in range(n_vertices):
+        # edge from vertex j to vertex i, closing the polygon on the first iteration
+        j = i - 1
+        xi, yi = vx[..., i], vy[..., i]
+        xj, yj = vx[..., j], vy[..., j]
+
+        # the horizontal ray from the point crosses the edge
+        crosses = (yi > y) != (yj > y)
+
+        # horizontal edges never cross, so the division by zero is masked out
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_intersect = (xj - xi) * (y - yi) / (yj - yi) + xi
+
+        inside ^= crosses & (x < x_intersect)
+
+    return inside
+
+
+def ellipse_half_extent(semi_axis_x, semi_axis_y, angle=0):
+    '''
+    Half width and half height of the bounding box of a rotated ellipse.
+
+    Parameters:
+    -----------
+    semi_axis_x, semi_axis_y : int/float or numpy.ndarray
+        Semi-axes of the ellipse before rotation
+    angle : int/float or numpy.ndarray, optional
+        Rotation of the ellipse in degrees
+
+    Returns:
+    --------
+    (half_width, half_height) : tuple
+    '''
+
+    theta = np.deg2rad(angle)
+    half_width = np.sqrt((semi_axis_x * np.cos(theta))**2 + (semi_axis_y * np.sin(theta))**2)
+    half_height = np.sqrt((semi_axis_x * np.sin(theta))**2 + (semi_axis_y * np.cos(theta))**2)
+
+    return half_width, half_height
+
+
+def aoi_bounding_box(aoi):
+    '''
+    Bounding box of an AOI, as (x_min, x_max, y_min, y_max) with inclusive bounds.
+
+    Parameters:
+    -----------
+    aoi : dict
+        A validated AOI definition
+
+    Returns:
+    --------
+    (x_min, x_max, y_min, y_max) : tuple of float
+    '''
+
+    shape = aoi['shape'].lower()
+    coordinates = aoi['coordinates']
+
+    if shape == 'rectangle':
+        x1, x2, y1, y2 = coordinates
+        return x1, x2, y1, y2
+
+    elif shape == 'circle':
+        x_center, y_center, radius = coordinates
+        return x_center - radius, x_center + radius, y_center - radius, y_center + radius
+
+    elif shape == 'ellipse':
+        x_center, y_center, semi_axis_x, semi_axis_y = coordinates[:4]
+        angle = coordinates[4] if len(coordinates) == 5 else 0
+        half_width, half_height = ellipse_half_extent(semi_axis_x, semi_axis_y, angle)
+        return (x_center - half_width, x_center + half_width,
+                y_center - half_height, y_center + half_height)
+
+    elif shape == 'polygon':
+        vertices = np.asarray(coordinates, dtype=float)
+        return (vertices[:, 0].min(), vertices[:, 0].max(),
+                vertices[:, 1].min(), vertices[:, 1].max())
+
+    raise ValueError(f"Unsupported AOI shape: {aoi['shape']}")
+
+
+def points_in_aoi(x, y, aoi):
+    '''
+    Test which points fall inside a single AOI.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Coordinates of the points
+    aoi : dict
+        A validated AOI definition
+
+    Returns:
+    --------
+    inside : numpy.ndarray of bool
+        True for every point inside the AOI
+    '''
+
+    shape = aoi['shape'].lower()
+    coordinates = aoi['coordinates']
+
+    if shape == 'rectangle':
+        return points_in_rectangle(x, y, *coordinates)
+
+    elif shape == 'circle':
+        return points_in_circle(x, y, *coordinates)
+
+    elif shape == 'ellipse':
+        return points_in_ellipse(x, y, *coordinates)
+
+    elif shape == 'polygon':
+        return points_in_polygon(x, y, coordinates)
+
+    raise ValueError(f"Unsupported AOI shape: {aoi['shape']}")
+
+
+def aoi_parameters(aoi):
+    '''
+    Coordinates of an AOI as a float array, with the ellipse angle filled in.
+
+    Parameters:
+    -----------
+    aoi : dict
+        A validated AOI definition
+
+    Returns:
+    --------
+    params : numpy.ndarray
+        Shape (n_params,), or (n_vertices, 2) for polygons
+    '''
+
+    coordinates = aoi['coordinates']
+
+    if aoi['shape'].lower() == 'ellipse' and len(coordinates) == 4:
+        coordinates = tuple(coordinates) + (0,)
+
+    return np.asarray(coordinates, dtype=float)
+
+
+def points_in_shape(x, y, shape, params):
+    '''
+    Test each point against its own AOI geometry.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Coordinates of the points, shape (n_points,)
+    shape : str
+        'rectangle', 'circle', 'ellipse' or 'polygon'
+    params : numpy.ndarray
+        One row of parameters per point as returned by `aoi_parameters`, shape
+        (n_points, n_params), or (n_points, n_vertices, 2) for polygons
+
+    Returns:
+    --------
+    inside : numpy.ndarray of bool
+        True for every point inside its AOI
+    '''
+
+    if shape == 'rectangle':
+        return points_in_rectangle(x, y, *params.T)
+
+    elif shape == 'circle':
+        return points_in_circle(x, y, *params.T)
+
+    elif shape == 'ellipse':
+        return points_in_ellipse(x, y, *params.T)
+
+    elif shape == 'polygon':
+        return points_in_polygon(x, y, params)
+
+    raise ValueError(f'Unsupported AOI shape: {shape}')
+
+
+def pixel_coordinates(x_coord, y_coord, screen_dimensions):
+    '''
+    Floor data points to pixels and flag the ones that fall on the screen.
+
+    Parameters:
+    -----------
+    x_coord, y_coord : numpy.ndarray
+        Coordinates of the data points
+    screen_dimensions : tuple
+        Screen dimensions (height, width)
+
+    Returns:
+    --------
+    x_pixel, y_pixel : numpy.ndarray of float
+        Floored coordinates, in the floating-point precision of the input
+    valid_mask : numpy.ndarray of bool
+        True for data points on the screen, False for outliers and missing coordinates
+    '''
+
+    # float32 data stays float32; integer data is promoted to float
+    x_pixel = np.floor(np.asarray(x_coord))
+    y_pixel = np.floor(np.asarray(y_coord))
+
+    # comparisons with NaN are False, so missing coordinates are excluded as well
+    screen_height, screen_width = screen_dimensions
+    valid_mask = (x_pixel >= 0) & (x_pixel < screen_width) & (y_pixel >= 0) & (y_pixel < screen_height)
+
+    return x_pixel, y_pixel, valid_mask
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 import numbers
+import sys
+from ._geometry import aoi_bounding_box
 
 def aoi_mask_validation(aoi_mask, screen_dimension):
     
@@ -28,8 +30,9 @@ def aoi_mask_validation(aoi_mask, screen_dimension):
     if len(aoi_mask.shape) != 2:
         raise ValueError('AOI mask should be a 2D array')
     
-    # check if aoi_mask is a binary mask
-    if not np.all(np.isin(aoi_mask, [0, 1])):
+    # check if aoi_mask is a binary mask; boolean masks are binary by construction,
+    # and comparing in place avoids the int64 copy np.isin makes of the whole mask
+    if aoi_mask.dtype != bool and not np.all((aoi_mask == 0) | (aoi_mask == 1)):
         raise ValueError('AOI mask should be a binary mask')
     
     # check if aoi_mask has the same shape as the screen dimension
@@ -39,6 +42,134 @@ def aoi_mask_validation(aoi_mask, screen_dimension):
     return None
 
 
+def _arrow_table_types():
+    
+    # Arrow tables can only exist if pyarrow has been imported, so never import it here
+    pyarrow = sys.modules.get('pyarrow')
+    return (pyarrow.Table, pyarrow.RecordBatch) if pyarrow is not None else ()
+
+def _polars_frame_types():
+    
+    # Polars frames can only exist if polars has been imported, so never import it here
+    polars = sys.modules.get('polars')
+    return (polars.DataFrame,) if polars is not None else ()
+
+def data_validation(data):
+    
+    '''
+    Validate the type of input data
+    
+    Parameters:
+    -----------
+    data : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of numpy.ndarray
+        Input data
+        
+    Returns:
+    --------
+    None
+    '''
+    
+    if isinstance(data, pd.DataFrame) or isinstance(data, _arrow_table_types() + _polars_frame_types()):
+        return None
+    
+    if isinstance(data, dict):
+        lengths = set(len(column) for column in data.values())
+        if len(lengths) > 1:
+            raise ValueError('All columns of the input data should have the same length')
+        return None
+    
+    raise ValueError('Input data should be a pandas DataFrame, a Polars DataFrame, an Arrow table, '
+                     'or a dictionary of numpy arrays')
+
+def data_columns(data):
+    
+    '''
+    Column names of validated input data
+    
+    Parameters:
+    -----------
+    data : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of numpy.ndarray
+        Input data
+        
+    Returns:
+    --------
+    columns : list of str
+    '''
+    
+    if isinstance(data, dict):
+        return list(data.keys())
+    
+    if isinstance(data, _arrow_table_types()):
+        return list(data.column_names)
+    
+    return list(data.columns)
+
+def data_column(data, name):
+    
+    '''
+    One column of validated input data as a numpy array, without copying where possible.
+    
+    Arrow and Polars columns without missing values are returned as views of their 
+    buffers; missing values of numeric columns become NaN.
+    
+    Parameters:
+    -----------
+    data : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of numpy.ndarray
+        Input data
+    name : str
+        Column name
+        
+    Returns:
+    --------
+    column : numpy.ndarray
+    '''
+    
+    if isinstance(data, dict):
+        return np.asarray(data[name])
+    
+    if isinstance(data, _arrow_table_types()):
+        return data.column(name).to_numpy()
+    
+    return data[name].to_numpy()
+
+def data_length(data):
+    
+    '''Number of rows of validated input data.'''
+    
+    if isinstance(data, dict):
+        return len(next(iter(data.values()))) if data else 0
+    
+    if isinstance(data, _arrow_table_types()):
+        return data.num_rows
+    
+    return len(data)
+
+def take_rows(data, rows):
+    
+    '''
+    Select rows of validated input data by position.
+    
+    pandas dataframes are returned as pandas dataframes, keeping their index; any other
+    input is returned as a dictionary of numpy arrays.
+    
+    Parameters:
+    -----------
+    data : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of numpy.ndarray
+        Input data
+    rows : numpy.ndarray
+        Positions of the rows to keep
+        
+    Returns:
+    --------
+    data : pd.DataFrame or dict of numpy.ndarray
+    '''
+    
+    if isinstance(data, pd.DataFrame):
+        return data.take(rows)
+    
+    return {name: data_column(data, name)[rows] for name in data_columns(data)}
+
+
 def dataframe_validation(df, screen_dimensions=None, drop_outlier=False, drop_nan=True):
     '''
     Validate the input dataframe and return the x and y coordinates if the dataframe is valid.
@@ -47,7 +178,7 @@ def dataframe_validation(df, screen_dimensions=None, drop_outlier=False, drop_na
     
     Parameters:
     -----------
-    df : pd.DataFrame
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of numpy.ndarray
         Input dataframe
     screen_dimensions : tuple, list, or numpy array, optional
         Screen dimensions (height, width)
@@ -59,26 +190,31 @@ def dataframe_validation(df, screen_dimensions=None, drop_outlier=False, drop_na
     (x_coord, y_coord) : tuple
         Tuple containing the x and y coordinates of the data points
     outlier_indices : numpy.ndarray
-        Indices of the data points outside the screen boundaries
-    df : pd.DataFrame
-        Updated dataframe with outliers dropped (if drop_outlier is True)
+        Indices of the data points outside the screen boundaries. For input other than
+        a pandas DataFrame, these are row positions.
+    df : pd.DataFrame or dict of numpy.ndarray
+        Updated dataframe with outliers dropped (if drop_outlier is True). Input other 
+        than a pandas DataFrame is returned as a dictionary of numpy arrays.
     '''
     # Check input type
-    if not isinstance(df, pd.DataFrame):
-        raise ValueError('Input data should be a pandas DataFrame')
+    data_validation(df)
+    columns = data_columns(df)
 
     # Validate coordinate columns
-    if set(['axp', 'ayp']).issubset(df.columns):
+    if set(['axp', 'ayp']).issubset(columns):
 
         x_name, y_name = 'axp', 'ayp'
             
-    elif set(['xpos', 'ypos']).issubset(df.columns):
+    elif set(['xpos', 'ypos']).issubset(columns):
         
         x_name, y_name = 'xpos', 'ypos'
             
     else:
         raise ValueError('Missing x and y coordinates')
     
+    if not isinstance(df, pd.DataFrame):
+        return _array_validation(df, x_name, y_name, screen_dimensions, drop_outlier, drop_nan)
+    
     # Check for mismatched x and y coordinates
     if not df[x_name].shape == df[y_name].shape:
         raise ValueError('Mismatched x and y coordinates')
@@ -117,6 +253,46 @@ def dataframe_validation(df, screen_dimensions=None, drop_outlier=False, drop_na
     
     return (x_coord.values, y_coord.values), outlier_indices
 
+def _array_validation(df, x_name, y_name, screen_dimensions, drop_outlier, drop_nan):
+    
+    '''dataframe_validation for Arrow, Polars and dictionary input, working on row positions.'''
+    
+    x_coord = data_column(df, x_name)
+    y_coord = data_column(df, y_name)
+    
+    # Check for mismatched x and y coordinates
+    if not x_coord.shape == y_coord.shape:
+        raise ValueError('Mismatched x and y coordinates')
+    
+    # Drop NaN values
+    rows = np.arange(len(x_coord))
+    if drop_nan:
+        keep = ~np.isnan(x_coord) & ~np.isnan(y_coord)
+        if not keep.all():
+            rows, x_coord, y_coord = rows[keep], x_coord[keep], y_coord[keep]
+    
+    # Initialize outlier_indices
+    outlier_indices = np.array([], dtype=int)
+    
+    # Validate screen dimensions and check for outliers
+    if screen_dimensions:
+        screen_dimensions_validation(screen_dimensions)
+        screen_height, screen_width = screen_dimensions
+        
+        outlier_mask = (x_coord < 0) | (x_coord >= screen_width) | \
+                       (y_coord < 0) | (y_coord >= screen_height)
+        
+        outlier_indices = rows[outlier_mask]
+        
+        if drop_outlier and outlier_mask.any():
+            rows, x_coord, y_coord = rows[~outlier_mask], x_coord[~outlier_mask], y_coord[~outlier_mask]
+    
+    # Return results
+    if drop_outlier:
+        return (x_coord, y_coord), outlier_indices, take_rows(df, rows)
+    
+    return (x_coord, y_coord), outlier_indices
+
 def aoi_definitions_validation(aoi_definitions, screen_dimensions):
     """
     Validate the input AOI definitions
@@ -125,10 +301,13 @@ def aoi_definitions_validation(aoi_definitions, screen_dimensions):
     -----------
     aoi_definitions : dict, list of dict, or numpy.ndarray of dict
         The AOI definitions to overlay on the plot. Each dict should contain:
-        - 'shape': 'rectangle' or 'circle'.
+        - 'shape': 'rectangle', 'circle', 'ellipse' or 'polygon'.
         - 'coordinates': tuple, list or np.ndarray of coordinates.
             - for rectangluar AOI's: (x1, x2, y1, y2), upper-bounds non-inclusive. 
             - for circlular AOI's: (x_center, y_center, radius).
+            - for elliptical AOI's: (x_center, y_center, semi_axis_x, semi_axis_y), 
+              optionally followed by a rotation angle in degrees.
+            - for polygonal AOI's: a sequence of at least three (x, y) vertices.
     screen_dimensions : tuple
         The dimensions of the screen in pixels (height, width).
         
@@ -163,7 +342,7 @@ def aoi_definitions_validation(aoi_definitions, screen_dimensions):
             raise KeyError(f'Missing keys in AOI definition: {missing_keys}')
         
         # check if the 'shape' key has a valid value
-        if aoi['shape'] not in ['rectangle', 'circle']:
+        if aoi['shape'] not in ['rectangle', 'circle', 'ellipse', 'polygon']:
             raise ValueError(f"Unsupported AOI shape: {aoi['shape']}")
         
         # check if the 'coordinates' key corresponds to a tuple, list, or numpy array
@@ -177,13 +356,36 @@ def aoi_definitions_validation(aoi_definitions, screen_dimensions):
         elif aoi['shape'] == 'circle' and len(aoi['coordinates']) != 3:
             raise ValueError('Circle coordinates should have three elements')
         
+        elif aoi['shape'] == 'ellipse' and len(aoi['coordinates']) not in (4, 5):
+            raise ValueError('Ellipse coordinates should have four or five elements')
+        
+        elif aoi['shape'] == 'polygon':
+            if len(aoi['coordinates']) < 3:
+                raise ValueError('Polygon coordinates should have at least three vertices')
+            if any(not isinstance(vertex, (tuple, list, np.ndarray)) or len(vertex) != 2
+                   for vertex in aoi['coordinates']):
+                raise ValueError('Polygon vertices should be (x, y) pairs')
+        
+        # flatten polygon vertices; the optional ellipse angle may be any real number
+        if aoi['shape'] == 'polygon':
+            coordinates = [coord for vertex in aoi['coordinates'] for coord in vertex]
+        elif aoi['shape'] == 'ellipse':
+            coordinates = list(aoi['coordinates'][:4])
+            if len(aoi['coordinates']) == 5 and not isinstance(aoi['coordinates'][4], numbers.Real):
+                raise ValueError('Ellipse angle must be a number')
+        else:
+            coordinates = aoi['coordinates']
+        
         # check if the 'coordinates' key has valid values (non-negative integers)
-        if not all(isinstance(coord, (numbers.Integral)) for coord in aoi['coordinates']):
+        if not all(isinstance(coord, (numbers.Integral)) for coord in coordinates):
             raise ValueError('All coordinates must be integers')
         
-        if any(coord < 0 for coord in aoi['coordinates']):
+        if any(coord < 0 for coord in coordinates):
             raise ValueError('Coordinates cannot be negative')
         
+        if aoi['shape'] == 'ellipse' and any(axis == 0 for axis in coordinates[2:4]):
+            raise ValueError('Ellipse semi-axes must be positive')
+        
         # check if the 'coordinates' key is within the screen boundaries
         screen_height, screen_width = screen_dimensions
 
@@ -205,6 +407,12 @@ def aoi_definitions_validation(aoi_definitions, screen_dimensions):
                 y_center - radius < 0 or y_center + radius > screen_height):
                 raise ValueError('AOI exceeds screen boundaries')
         
+        elif aoi['shape'] in ['ellipse', 'polygon']:
+            x_min, x_max, y_min, y_max = aoi_bounding_box(aoi)
+            
+            if x_min < 0 or x_max > screen_width or y_min < 0 or y_max > screen_height:
+                raise ValueError('AOI exceeds screen boundaries')
+        
     return None
 
 def screen_dimensions_validation(screen_dimensions):
@@ -238,3 +446,137 @@ def screen_dimensions_validation(screen_dimensions):
         raise ValueError('Screen dimensions should have positive integer values.')
     
     return None
+
+def bins_validation(bins, screen_dimensions):
+    
+    '''
+    Validate the heatmap bins and return the number of bins along each axis
+    
+    Parameters:
+    -----------
+    bins : int, tuple, list, numpy.ndarray or None
+        Number of bins for both dimensions, or (bins_x, bins_y). None gives one bin
+        per 10 pixels.
+    screen_dimensions : tuple
+        Screen dimensions (height, width)
+    
+    Returns:
+    --------
+    bins_x, bins_y : int
+        Number of bins along the x and y axes
+    '''
+    
+    screen_height, screen_width = screen_dimensions
+    
+    if bins is None:
+        bins_x, bins_y = int(screen_width / 10), int(screen_height / 10)
+    elif isinstance(bins, numbers.Integral):
+        bins_x = bins_y = bins
+    elif isinstance(bins, (tuple, list, np.ndarray)) and len(bins) == 2:
+        bins_x, bins_y = bins
+    else:
+        raise ValueError("`bins` must be an integer or a tuple of two integers.")
+    
+    if not all(isinstance(n_bins, numbers.Integral) for n_bins in (bins_x, bins_y)):
+        raise ValueError("`bins` must be an integer or a tuple of two integers.")
+    
+    if min(bins_x, bins_y) < 1:
+        raise ValueError('bins should be positive')
+    
+    return int(bins_x), int(bins_y)
+
+def aoi_tracks_validation(aoi_tracks, screen_dimensions):
+    '''
+    Validate the input dynamic AOI tracks
+    
+    Parameters:
+    -----------
+    aoi_tracks : dict or list of dict
+        The dynamic AOI tracks. Each dict should contain:
+        - 'shape': 'rectangle', 'circle', 'ellipse' or 'polygon'.
+        - 'keyframes': list of dict, each with a 'time' and 'coordinates' in the
+          format of `aoi_definitions_validation`, with strictly increasing times.
+        - 'interpolation': 'linear' or 'step', optional.
+    screen_dimensions : tuple
+        The dimensions of the screen in pixels (height, width).
+        
+    Returns:
+    --------
+    None
+    '''
+    
+    # check if aoi_tracks is not empty
+    if not aoi_tracks:
+        raise ValueError('AOI tracks cannot be empty')
+    
+    # check if aoi_tracks is a dictionary or a list of dictionaries
+    if isinstance(aoi_tracks, dict):
+        aoi_tracks = [aoi_tracks]
+    
+    if not isinstance(aoi_tracks, (list, np.ndarray)) or any(not isinstance(track, dict) for track in aoi_tracks):
+        raise ValueError('AOI tracks should be a dictionary or a list of dictionaries')
+    
+    for track in aoi_tracks:
+        
+        # check if the required keys are present in the dictionary
+        required_keys = ['shape', 'keyframes']
+        missing_keys = [key for key in required_keys if key not in track.keys()]
+        if missing_keys:
+            raise KeyError(f'Missing keys in AOI track: {missing_keys}')
+        
+        if track.get('interpolation', 'linear') not in ['linear', 'step']:
+            raise ValueError(f"Unsupported interpolation: {track['interpolation']}")
+        
+        keyframes = track['keyframes']
+        if not isinstance(keyframes, (list, tuple)) or not keyframes:
+            raise ValueError('AOI track keyframes should be a non-empty list')
+        
+        if any(not isinstance(keyframe, dict) or 'time' not in keyframe or 'coordinates' not in keyframe
+               for keyframe in keyframes):
+            raise ValueError("Each keyframe should be a dictionary with 'time' and 'coordinates'")
+        
+        # check if the keyframe times are numbers in strictly increasing order
+        times = [keyframe['time'] for keyframe in keyframes]
+        if not all(isinstance(time, numbers.Real) for time in times):
+            raise ValueError('Keyframe times should be numbers')
+        
+        if any(later <= earlier for earlier, later in zip(times[:-1], times[1:])):
+            raise ValueError('Keyframe times should be strictly increasing')
+        
+        # every keyframe is a valid static AOI of the track shape
+        aoi_definitions_validation([{'shape': track['shape'], 'coordinates': keyframe['coordinates']}
+                                    for keyframe in keyframes], screen_dimensions)
+        
+        if track['shape'] == 'polygon' and len(set(len(keyframe['coordinates']) for keyframe in keyframes)) > 1:
+            raise ValueError('All keyframes of a polygon track should have the same number of vertices')
+        
+    return None
+
+def binocular_dataframe_validation(df):
+    '''
+    Validate binocular input data and return the coordinates of both eyes stacked together.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of numpy.ndarray
+        Input dataframe with 'xpos_left', 'ypos_left', 'xpos_right' and 'ypos_right' 
+        columns, as produced by eyelinkio for binocular recordings.
+        
+    Returns:
+    --------
+    (x_coord, y_coord) : tuple
+        Arrays of shape (2, number of samples), left eye first. Missing samples are kept 
+        as NaN, so both eyes stay aligned.
+    '''
+    # Check input type
+    data_validation(df)
+    
+    # Validate coordinate columns
+    required_columns = ['xpos_left', 'ypos_left', 'xpos_right', 'ypos_right']
+    if not set(required_columns).issubset(data_columns(df)):
+        raise ValueError('Missing binocular x and y coordinates')
+    
+    x_coord = np.stack([data_column(df, 'xpos_left'), data_column(df, 'xpos_right')])
+    y_coord = np.stack([data_column(df, 'ypos_left'), data_column(df, 'ypos_right')])
+    
+    return x_coord, y_coord
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from ._utility import (aoi_mask_validation, binocular_dataframe_validation, screen_dimensions_validation,
+                       bins_validation, data_columns, data_column)
+from ._geometry import pixel_coordinates
+
+EYES = ('left', 'right', 'combined')
+
+def _combine(x_coord, y_coord, method):
+    '''Combined gaze position from stacked (2, N) left/right coordinates.'''
+
+    valid = ~np.isnan(x_coord) & ~np.isnan(y_coord)
+
+    if method == 'average':
+        # average both eyes where both are tracked, otherwise use the tracked eye
+        n_valid = valid.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_combined = np.where(valid, x_coord, 0).sum(axis=0) / n_valid
+            y_combined = np.where(valid, y_coord, 0).sum(axis=0) / n_valid
+        return x_combined, y_combined
+
+    elif method == 'best':
+        # the eye with the fewest missing samples, left eye on ties
+        best = int(valid[1].sum() > valid[0].sum())
+        return x_coord[best], y_coord[best]
+
+    raise ValueError("combine should be 'average' or 'best'")
+
+def combine_eyes(df, combine='average'):
+    """
+    Add monocular 'xpos' and 'ypos' columns to binocular data, so that it can be used
+    with every other function of the package.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Binocular data with 'xpos_left', 'ypos_left', 'xpos_right' and 'ypos_right' columns.
+    combine : str, optional
+        'average' to average both eyes (falling back to the tracked eye when one is lost),
+        or 'best' to use the eye with the fewest missing samples.
+    
+    Returns:
+    --------
+    df : pd.DataFrame or dict of np.array
+        Copy of the data with the combined 'xpos' and 'ypos' columns; a dictionary of numpy
+        arrays for any input other than a pandas dataframe.
+    """
+    
+    x_coord, y_coord = binocular_dataframe_validation(df)
+    x_combined, y_combined = _combine(x_coord, y_coord, combine)
+    
+    if isinstance(df, pd.DataFrame):
+        return df.assign(xpos=x_combined, ypos=y_combined)
+    
+    return {**{name: data_column(df, name) for name in data_columns(df)}, 'xpos': x_combined, 'ypos': y_combined}
+
+def binocular_summary(df, screen_dimensions, aoi_mask=None, combine='average', bins=None):
+    """
+    Compute AOI statistics and heatmaps for the left eye, the right eye and both eyes
+    combined in a single pass.
+    
+    The coordinates of the three are stacked into one (3, N) array, so the data is
+    validated, floored to pixels and looked up in the AOI mask once. Percentages follow
+    `percent_data_in_aoi`: data points outside the screen or with missing coordinates
+    are left out of the total.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Binocular data with 'xpos_left', 'ypos_left', 'xpos_right' and 'ypos_right'
+        columns, e.g. the epoched data returned by `epoch_data`.
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    aoi_mask : 2D np.array, optional
+        Binary mask of the AOI, as returned by `define_aoi`.
+    combine : str, optional
+        How to combine the eyes, see `combine_eyes`.
+    bins : int or tuple, optional
+        Number of heatmap bins for both dimensions, or a tuple (bins_x, bins_y). By 
+        default, one bin per 10 pixels as in `plot_heatmap`.
+    
+    Returns:
+    --------
+    summary : dict
+        For each of 'left', 'right' and 'combined', a dict with:
+        - 'percent_in_aoi': percentage of data points in the AOI (only with `aoi_mask`).
+        - 'epoch_percent_in_aoi': the same per epoch, as a pd.Series indexed by epoch
+          (only with `aoi_mask` and an 'epoch_index' column). Data points with a missing
+          epoch index belong to no epoch.
+        - 'data_loss': percentage of data points with missing or off-screen coordinates.
+        - 'heatmap': 2D array of counts of shape (bins_y, bins_x), covering the screen.
+    """
+    
+    # validate screen_dimensions
+    screen_dimensions_validation(screen_dimensions)
+    screen_height, screen_width = screen_dimensions
+    
+    # validate aoi_mask
+    if aoi_mask is not None:
+        aoi_mask_validation(aoi_mask, screen_dimensions)
+    
+    # validate bins, with the same default as plot_heatmap
+    bins_x, bins_y = bins_validation(bins, screen_dimensions)
+    
+    # stack the left, right and combined coordinates
+    x_coord, y_coord = binocular_dataframe_validation(df)
+    x_combined, y_combined = _combine(x_coord, y_coord, combine)
+    x_coord = np.vstack([x_coord, x_combined])
+    y_coord = np.vstack([y_coord, y_combined])
+    n_eyes, n_samples = x_coord.shape
+    
+    x_pixel, y_pixel, valid = pixel_coordinates(x_coord, y_coord, screen_dimensions)
+    n_valid = valid.sum(axis=1)
+    
+    # eye of every valid data point, to count everything with one bincount per statistic
+    eye_codes = np.broadcast_to(np.arange(n_eyes)[:, None], valid.shape)[valid]
+    x_valid = x_pixel[valid].astype(np.intp)
+    y_valid = y_pixel[valid].astype(np.intp)
+    
+    # heatmaps over the screen, binning pixels evenly
+    x_bins = x_valid * bins_x // screen_width
+    y_bins = y_valid * bins_y // screen_height
+    heatmaps = np.bincount((eye_codes * bins_y + y_bins) * bins_x + x_bins,
+                           minlength=n_eyes * bins_y * bins_x).reshape(n_eyes, bins_y, bins_x)
+    
+    summary = {eye: {'data_loss': (1 - n_valid[idx] / n_samples) * 100 if n_samples else np.nan,
+                     'heatmap': heatmaps[idx]}
+               for idx, eye in enumerate(EYES)}
+    
+    if aoi_mask is not None:
+        in_aoi = aoi_mask[y_valid, x_valid] != 0
+        n_in_aoi = np.bincount(eye_codes, weights=in_aoi, minlength=n_eyes)
+        
+        for idx, eye in enumerate(EYES):
+            summary[eye]['percent_in_aoi'] = n_in_aoi[idx] / n_valid[idx] * 100 if n_valid[idx] else np.nan
+        
+        if 'epoch_index' in data_columns(df):
+            epoch_codes, epochs = pd.factorize(data_column(df, 'epoch_index'), sort=True)
+            epoch_codes = np.broadcast_to(epoch_codes, valid.shape)[valid]
+            n_epochs = len(epochs)
+            
+            # counts per (eye, epoch) pair; data points with a missing epoch index (code -1)
+            # belong to no epoch
+            in_epoch = epoch_codes >= 0
+            pair_codes = eye_codes[in_epoch] * n_epochs + epoch_codes[in_epoch]
+            epoch_valid = np.bincount(pair_codes, minlength=n_eyes * n_epochs).reshape(n_eyes, n_epochs)
+            epoch_in_aoi = np.bincount(pair_codes, weights=in_aoi[in_epoch],
+                                       minlength=n_eyes * n_epochs).reshape(n_eyes, n_epochs)
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                epoch_percent = epoch_in_aoi / epoch_valid * 100
+            
+            for idx, eye in enumerate(EYES):
+                summary[eye]['epoch_percent_in_aoi'] = pd.Series(epoch_percent[idx], index=pd.Index(epochs, name='epoch_index'))
+    
+    return summary
@@ -0,0 +1,148 @@
+import numpy as np
+from ._utility import (dataframe_validation, aoi_tracks_validation, screen_dimensions_validation,
+                       data_validation, data_columns, data_column)
+from ._geometry import aoi_parameters, points_in_shape, pixel_coordinates
+
+def interpolate_aoi_track(track, times):
+    """
+    Find the geometry of a dynamic AOI at each of the given times.
+    
+    A track is active from its first to its last keyframe, both inclusive. In between,
+    coordinates are linearly interpolated between the surrounding keyframes, or held at
+    the previous keyframe if the track's 'interpolation' is 'step'. Angles of rotated
+    ellipses are interpolated as plain numbers.
+    
+    Parameters:
+    -----------
+    track : dict
+        A validated AOI track, see `dynamic_aoi_hits`.
+    times : np.array
+        Times to evaluate the track at, in any order.
+        
+    Returns:
+    --------
+    active : np.array of bool
+        Whether the track is active at each time.
+    params : np.array
+        Geometry at each active time, shape (number of active times, number of parameters),
+        or (number of active times, number of vertices, 2) for polygons.
+    """
+    
+    times = np.asarray(times, dtype=float)
+    keyframe_times = np.array([keyframe['time'] for keyframe in track['keyframes']], dtype=float)
+    keyframe_params = np.stack([aoi_parameters({'shape': track['shape'], 'coordinates': keyframe['coordinates']})
+                                for keyframe in track['keyframes']])
+    
+    # comparisons with NaN are False, so missing times are never active
+    active = (times >= keyframe_times[0]) & (times <= keyframe_times[-1])
+    active_times = times[active]
+    
+    # sorted-interval join: index of the keyframe that starts the segment of each time
+    segment = np.searchsorted(keyframe_times, active_times, side='right') - 1
+    segment = np.clip(segment, 0, len(keyframe_times) - 1)
+    
+    if track.get('interpolation', 'linear') == 'step' or len(keyframe_times) == 1:
+        return active, keyframe_params[segment]
+    
+    # the last keyframe opens no segment of its own
+    segment = np.minimum(segment, len(keyframe_times) - 2)
+    start_times = keyframe_times[segment]
+    fraction = (active_times - start_times) / (keyframe_times[segment + 1] - start_times)
+    fraction = fraction.reshape((-1,) + (1,) * (keyframe_params.ndim - 1))
+    
+    params = keyframe_params[segment] + fraction * (keyframe_params[segment + 1] - keyframe_params[segment])
+    
+    return active, params
+
+def _dynamic_aoi_hits(df, aoi_tracks, screen_dimensions):
+    '''Hits of `dynamic_aoi_hits`, and the mask of the data points on the screen.'''
+    
+    # check if data has a time column
+    data_validation(df)
+    
+    if 'time' not in data_columns(df):
+        raise ValueError('data should contain a time column')
+    
+    # validate screen_dimensions
+    screen_dimensions_validation(screen_dimensions)
+    
+    # validate aoi_tracks
+    aoi_tracks_validation(aoi_tracks, screen_dimensions)
+    
+    if isinstance(aoi_tracks, dict):
+        aoi_tracks = [aoi_tracks]
+    
+    # get the x and y coordinates of the data points, keeping every row
+    (x_coord, y_coord), _ = dataframe_validation(df, drop_nan=False)
+    
+    x_coord, y_coord, valid_mask = pixel_coordinates(x_coord, y_coord, screen_dimensions)
+    times = np.asarray(data_column(df, 'time'), dtype=float)
+    
+    hits = np.zeros((len(x_coord), len(aoi_tracks)), dtype=bool)
+    
+    for idx, track in enumerate(aoi_tracks):
+        active, params = interpolate_aoi_track(track, times[valid_mask])
+        rows = np.flatnonzero(valid_mask)[active]
+        
+        hits[rows, idx] = points_in_shape(x_coord[rows], y_coord[rows], track['shape'].lower(), params)
+    
+    return hits, valid_mask
+
+def dynamic_aoi_hits(df, aoi_tracks, screen_dimensions):
+    """
+    Test every data point against the geometry of each dynamic AOI at the time of the data point.
+    
+    As with `define_aoi`, data points are floored to pixels before testing, and data points
+    outside the screen or with missing coordinates are never inside an AOI.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Dataframe containing the time and the x and y coordinates of the data points.
+    aoi_tracks : dict or a list of dict
+        Each dictionary defines one moving AOI with keys:
+        - 'shape': 'rectangle', 'circle', 'ellipse' or 'polygon'.
+        - 'keyframes': list of dict, each with keys:
+            - 'time': time of the keyframe, in the units of the time column.
+            - 'coordinates': coordinates of the AOI at that time, as for `define_aoi`.
+        - 'interpolation': 'linear' (default) or 'step', optional.
+        
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    
+    Returns:
+    --------
+    hits : 2D np.array of bool
+        Array of shape (number of data points, number of AOI tracks).
+    """
+    
+    hits, _ = _dynamic_aoi_hits(df, aoi_tracks, screen_dimensions)
+    
+    return hits
+
+def percent_data_in_dynamic_aoi(df, aoi_tracks, screen_dimensions):
+    """
+    Calculate the percentage of data points inside any of the dynamic AOIs active at their time.
+    
+    As in `percent_data_in_aoi`, data points outside the screen or with missing coordinates
+    are left out of the total.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Dataframe containing the time and the x and y coordinates of the data points.
+    aoi_tracks : dict or a list of dict
+        Dynamic AOI tracks, see `dynamic_aoi_hits`.
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    
+    Returns:
+    --------
+    percent_in_aoi : float
+        Percentage of data points in the AOIs.
+    """
+    
+    # count only the data points that are on screen
+    hits, valid_mask = _dynamic_aoi_hits(df, aoi_tracks, screen_dimensions)
+    
+    return hits.any(axis=1).sum() / valid_mask.sum() * 100
@@ -0,0 +1,142 @@
+import numpy as np
+from ._utility import (dataframe_validation, aoi_definitions_validation, screen_dimensions_validation,
+                       data_columns, data_column)
+from ._geometry import pixel_coordinates
+
+class GazeIntegralImage:
+    """
+    Summed-area table of the number of data points on each pixel of the screen.
+
+    Built once from the data, it answers the number and percentage of data points inside
+    any rectangle with four lookups, whatever the size of the rectangle. This makes it cheap
+    to score many candidate rectangular AOIs against the same data. Counts match a lookup in
+    the mask returned by `define_aoi`, and percentages match `percent_data_in_aoi`: data
+    points are floored to pixels, and data points outside the screen or with missing
+    coordinates are left out.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Dataframe containing the x and y coordinates of the data points.
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    per_epoch : bool, optional
+        Build one table per epoch, using the 'epoch_index' column returned by `epoch_data`.
+    """
+
+    def __init__(self, df, screen_dimensions, per_epoch=False):
+
+        # validate screen_dimensions
+        screen_dimensions_validation(screen_dimensions)
+        self.screen_dimensions = tuple(screen_dimensions)
+        screen_height, screen_width = screen_dimensions
+
+        # get the x and y coordinates of the data points, keeping every row
+        (x_coord, y_coord), _ = dataframe_validation(df, drop_nan=False)
+        x_pixel, y_pixel, valid_mask = pixel_coordinates(x_coord, y_coord, screen_dimensions)
+        pixels = y_pixel[valid_mask].astype(np.intp) * screen_width + x_pixel[valid_mask].astype(np.intp)
+
+        if per_epoch:
+            if 'epoch_index' not in data_columns(df):
+                raise ValueError('data should contain an epoch_index column')
+
+            self.epochs, epoch_codes = np.unique(data_column(df, 'epoch_index')[valid_mask], return_inverse=True)
+        else:
+            self.epochs = None
+            epoch_codes = np.zeros(len(pixels), dtype=np.intp)
+
+        n_tables = 1 if self.epochs is None else len(self.epochs)
+
+        # the padded table is allocated once, in its final type: int32 holds any realistic
+        # number of data points
+        dtype = np.int32 if len(pixels) <= np.iinfo(np.int32).max else np.int64
+        table = np.zeros((n_tables, screen_height + 1, screen_width + 1), dtype=dtype)
+
+        # pixel-level counts of one epoch at a time, below a leading row and column of zeros
+        order = np.argsort(epoch_codes, kind='stable')
+        bounds = np.searchsorted(epoch_codes[order], np.arange(n_tables + 1))
+        for epoch in range(n_tables):
+            counts = np.bincount(pixels[order[bounds[epoch]:bounds[epoch + 1]]], minlength=screen_height * screen_width)
+            table[epoch, 1:, 1:] = counts.reshape(screen_height, screen_width)
+
+        # cumulate along both screen axes, in place
+        np.cumsum(table[:, 1:, 1:], axis=1, out=table[:, 1:, 1:])
+        np.cumsum(table[:, 1:, 1:], axis=2, out=table[:, 1:, 1:])
+        self.table = table
+
+        self.totals = self.table[:, -1, -1].astype(np.int64)
+
+    def _rectangles(self, rectangles):
+        '''Validate rectangles and return them as an (n, 4) integer array of (x1, x2, y1, y2).'''
+
+        if isinstance(rectangles, dict) or (isinstance(rectangles, list) and rectangles and
+                                            isinstance(rectangles[0], dict)):
+            aoi_definitions_validation(rectangles, self.screen_dimensions)
+            if isinstance(rectangles, dict):
+                rectangles = [rectangles]
+            if any(aoi['shape'] != 'rectangle' for aoi in rectangles):
+                raise ValueError('Only rectangular AOIs can be queried')
+            rectangles = [aoi['coordinates'] for aoi in rectangles]
+
+        rectangles = np.asarray(rectangles)
+
+        if rectangles.ndim == 1:
+            rectangles = rectangles[None, :]
+
+        if rectangles.ndim != 2 or rectangles.shape[1] != 4:
+            raise ValueError('Rectangles should have four coordinates (x1, x2, y1, y2)')
+
+        if rectangles.size and not np.issubdtype(rectangles.dtype, np.integer):
+            raise ValueError('All coordinates must be integers')
+
+        x1, x2, y1, y2 = rectangles.T
+        screen_height, screen_width = self.screen_dimensions
+        if np.any((x1 < 0) | (y1 < 0) | (x1 > x2) | (y1 > y2) | (x2 > screen_width) | (y2 > screen_height)):
+            raise ValueError('Rectangles should be within the screen, with x1 <= x2 and y1 <= y2')
+
+        return rectangles.astype(np.intp)
+
+    def counts(self, rectangles):
+        '''
+        Count the data points inside each rectangle, upper-bounds non-inclusive.
+
+        Parameters:
+        -----------
+        rectangles : np.array, list, or rectangular AOI definitions
+            Rectangles as rows of (x1, x2, y1, y2), or rectangular AOI definitions
+
+        Returns:
+        --------
+        counts : np.array of int
+            Shape (number of rectangles,), or (number of epochs, number of rectangles)
+            for a per-epoch table
+        '''
+
+        x1, x2, y1, y2 = self._rectangles(rectangles).T
+        table = self.table
+
+        counts = (table[:, y2, x2].astype(np.int64) - table[:, y1, x2] - table[:, y2, x1] + table[:, y1, x1])
+
+        return counts if self.epochs is not None else counts[0]
+
+    def percent(self, rectangles):
+        '''
+        Percentage of the data points inside each rectangle, upper-bounds non-inclusive.
+
+        Parameters:
+        -----------
+        rectangles : np.array, list, or rectangular AOI definitions
+            Rectangles as rows of (x1, x2, y1, y2), or rectangular AOI definitions
+
+        Returns:
+        --------
+        percent : np.array of float
+            Shape (number of rectangles,), or (number of epochs, number of rectangles)
+            for a per-epoch table
+        '''
+
+        counts = self.counts(rectangles)
+        totals = self.totals if self.epochs is not None else self.totals[0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return counts / np.reshape(totals, (-1, 1) if self.epochs is not None else ()) * 100
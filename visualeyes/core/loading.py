@@ -0,0 +1,110 @@
+import collections
+import collections.abc
+import numbers
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+def read_edf(path):
+    '''
+    Read an EDF file with eyelinkio.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the EDF file
+
+    Returns:
+    --------
+    edf : eyelinkio.EDF
+        The parsed recording
+    '''
+
+    import eyelinkio
+
+    return eyelinkio.read_edf(path)
+
+def prefetch_recordings(paths, loader=read_edf, prefetch=2, n_workers=None):
+    """
+    Load recordings in background threads while the current one is being processed.
+
+    Recordings are yielded in the order of `paths`. At most `prefetch` recordings are read
+    ahead of the one being processed, so no more than `prefetch + 1` recordings are held in
+    memory at once: the next read only starts once the caller asks for the next recording.
+    Errors raised while loading a recording are raised when that recording is reached.
+
+    Example:
+    --------
+    >>> for path, edf in prefetch_recordings(edf_paths, prefetch=4):
+    ...     samples = edf.to_pandas()['samples']
+    ...     epochs, epoched = epoch_data(samples, window_start, window_duration)
+    ...     percent = percent_data_in_aoi(epoched, aoi_mask, screen_dimensions)
+
+    Parameters:
+    -----------
+    paths : iterable
+        Paths of the recordings, or any other argument accepted by `loader`. Consumed lazily;
+        a list or other sized collection should not be empty.
+    loader : callable, optional
+        Function reading and parsing one recording, by default `read_edf`.
+    prefetch : int, optional
+        Number of recordings to read ahead.
+    n_workers : int, optional
+        Number of loading threads, by default `prefetch`.
+
+    Returns:
+    --------
+    recordings : generator of (path, recording) tuples
+        Each path with the recording loaded from it. The arguments are checked when
+        `prefetch_recordings` is called; loading starts with the first iteration.
+    """
+
+    if isinstance(paths, (str, bytes, os.PathLike)):
+        raise ValueError('paths should be an iterable of paths, not a single path')
+
+    if isinstance(paths, collections.abc.Sized) and len(paths) == 0:
+        raise ValueError('paths should not be empty')
+
+    if not callable(loader):
+        raise ValueError('loader should be callable')
+
+    if not isinstance(prefetch, numbers.Integral) or prefetch < 1:
+        raise ValueError('prefetch should be a positive integer')
+
+    if n_workers is None:
+        n_workers = prefetch
+    elif not isinstance(n_workers, numbers.Integral) or n_workers < 1:
+        raise ValueError('n_workers should be a positive integer')
+
+    # validate now, and leave the reading to the generator
+    return _prefetch(iter(paths), loader, prefetch, n_workers)
+
+def _prefetch(paths, loader, prefetch, n_workers):
+    '''Generator of `prefetch_recordings`, on validated arguments.'''
+
+    pending = collections.deque()
+    executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix='visualeyes-prefetch')
+
+    def submit_next():
+        for path in paths:
+            pending.append((path, executor.submit(loader, path)))
+            return
+
+    try:
+        # fill the queue, then keep it full as recordings are handed out
+        for _ in range(prefetch):
+            submit_next()
+
+        while pending:
+            path, future = pending.popleft()
+            recording = future.result()
+            submit_next()
+
+            yield path, recording
+
+            # drop the reference before waiting for the next recording
+            del recording
+    finally:
+        # stop reading ahead if the caller breaks out of the loop or an error is raised
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
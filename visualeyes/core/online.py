@@ -0,0 +1,307 @@
+import numbers
+import socket
+import time
+import numpy as np
+from ._utility import data_validation, data_columns, data_column, screen_dimensions_validation, bins_validation
+from ._geometry import pixel_coordinates
+from .spatial import AOIGridIndex
+
+class OnlineQC:
+    """
+    Rolling data-quality statistics over the most recent samples of a live recording.
+
+    The last `window` samples are kept in ring buffers, together with what each of them adds
+    to the statistics: whether it is lost, on the screen, in each AOI, and its heatmap bin.
+    Adding a sample adds its contribution and subtracts that of the sample it overwrites,
+    so the statistics are updated in constant time per sample, whatever the window length.
+    Samples are added in batches, each processed with a few vectorized operations.
+
+    As in `percent_data_in_aoi`, samples are floored to pixels, and AOI percentages are
+    relative to the samples on the screen. Samples with missing coordinates count as lost.
+
+    Example:
+    --------
+    >>> qc = OnlineQC(screen_dimensions, aoi_definitions, window=2000)
+    >>> for batch in socket_samples(('localhost', 4000)):
+    ...     qc.update(batch)
+    ...     if qc.track_loss > 20:
+    ...         print('Check the tracker')
+
+    Parameters:
+    -----------
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    aoi_definitions : dict or list of dict, optional
+        AOI definitions, as accepted by `define_aoi`.
+    window : int, optional
+        Number of most recent samples the statistics are computed over.
+    bins : int or tuple, optional
+        Bins of the heatmap, as in `plot_heatmap`; by default one bin per 10 pixels.
+    """
+
+    def __init__(self, screen_dimensions, aoi_definitions=None, window=1000, bins=None):
+
+        # validate screen_dimensions
+        screen_dimensions_validation(screen_dimensions)
+        self.screen_dimensions = tuple(screen_dimensions)
+
+        if not isinstance(window, numbers.Integral) or window < 1:
+            raise ValueError('window should be a positive integer')
+
+        self.window = int(window)
+        self.aoi_index = AOIGridIndex(aoi_definitions, screen_dimensions) if aoi_definitions is not None else None
+        n_aois = len(self.aoi_index.aoi_definitions) if self.aoi_index is not None else 0
+
+        # same default bins as plot_heatmap
+        self.bins = bins_validation(bins, screen_dimensions)
+
+        # ring buffers: coordinates, and the contribution of each sample to the statistics
+        self._x = np.full(self.window, np.nan)
+        self._y = np.full(self.window, np.nan)
+        self._lost = np.zeros(self.window, dtype=bool)
+        self._on_screen = np.zeros(self.window, dtype=bool)
+        self._hits = np.zeros((self.window, n_aois), dtype=bool)
+        self._any_hit = np.zeros(self.window, dtype=bool)
+        self._bin = np.full(self.window, -1, dtype=np.intp)
+        self._head = 0
+        self._filled = 0
+
+        # running totals over the window
+        self._n_lost = 0
+        self._n_on_screen = 0
+        self._aoi_counts = np.zeros(n_aois, dtype=np.int64)
+        self._n_any_hit = 0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._heatmap = np.zeros(self.bins[1] * self.bins[0], dtype=np.int64)
+
+        self.n_samples = 0
+        self.last_time = None
+        self.last_update_seconds = 0.0
+        self.max_update_seconds = 0.0
+
+    def update(self, samples):
+        '''
+        Add a batch of samples, replacing the oldest samples of the window.
+
+        Parameters:
+        -----------
+        samples : dict of np.array, pd.DataFrame, pyarrow.Table or polars.DataFrame
+            Samples with 'xpos' and 'ypos' columns, and optionally a 'time' column, in the
+            order they were recorded.
+
+        Returns:
+        --------
+        self : OnlineQC
+        '''
+
+        start = time.perf_counter()
+
+        data_validation(samples)
+        columns = data_columns(samples)
+        if 'xpos' not in columns or 'ypos' not in columns:
+            raise ValueError('samples should contain xpos and ypos columns')
+
+        x_coord = np.asarray(data_column(samples, 'xpos'), dtype=float)
+        y_coord = np.asarray(data_column(samples, 'ypos'), dtype=float)
+        n_new = len(x_coord)
+
+        if n_new == 0:
+            return self
+
+        self.n_samples += n_new
+        if 'time' in columns:
+            self.last_time = float(data_column(samples, 'time')[-1])
+
+        # samples older than the window would be overwritten within this batch
+        if n_new > self.window:
+            x_coord, y_coord = x_coord[-self.window:], y_coord[-self.window:]
+            n_new = self.window
+
+        # contribution of the new samples
+        lost = np.isnan(x_coord) | np.isnan(y_coord)
+        _, _, on_screen = pixel_coordinates(x_coord, y_coord, self.screen_dimensions)
+
+        hits = np.zeros((n_new, len(self._aoi_counts)), dtype=bool)
+        if self.aoi_index is not None:
+            point_indices, aoi_indices = self.aoi_index.hits(x_coord, y_coord)
+            hits[point_indices, aoi_indices] = True
+
+        screen_height, screen_width = self.screen_dimensions
+        bins_x, bins_y = self.bins
+        heatmap_bins = np.full(n_new, -1, dtype=np.intp)
+        heatmap_bins[on_screen] = ((y_coord[on_screen] * bins_y // screen_height).astype(np.intp) * bins_x +
+                                   (x_coord[on_screen] * bins_x // screen_width).astype(np.intp))
+
+        # remove the contribution of the samples being overwritten; the buffers fill up from
+        # the first slot, so only the slots past the empty ones hold samples
+        slots = (self._head + np.arange(n_new)) % self.window
+        self._remove(slots[self.window - self._filled:])
+
+        # write the new samples and add their contribution
+        self._x[slots], self._y[slots] = x_coord, y_coord
+        self._lost[slots], self._on_screen[slots] = lost, on_screen
+        self._hits[slots], self._any_hit[slots] = hits, hits.any(axis=1)
+        self._bin[slots] = heatmap_bins
+
+        self._n_lost += int(lost.sum())
+        self._n_on_screen += int(on_screen.sum())
+        self._aoi_counts += hits.sum(axis=0)
+        self._n_any_hit += int(self._any_hit[slots].sum())
+        self._sum_x += float(x_coord[~lost].sum())
+        self._sum_y += float(y_coord[~lost].sum())
+        np.add.at(self._heatmap, heatmap_bins[on_screen], 1)
+
+        self._filled = min(self._filled + n_new, self.window)
+        if self._head + n_new >= self.window:
+            # once per pass over the buffers, recompute the running sums to stop rounding errors
+            # from accumulating, amortized over the window
+            self._sum_x = float(np.nansum(np.where(self._lost, np.nan, self._x)))
+            self._sum_y = float(np.nansum(np.where(self._lost, np.nan, self._y)))
+        self._head = (self._head + n_new) % self.window
+
+        self.last_update_seconds = time.perf_counter() - start
+        self.max_update_seconds = max(self.max_update_seconds, self.last_update_seconds)
+
+        return self
+
+    def _remove(self, slots):
+
+        if not len(slots):
+            return
+
+        kept = ~self._lost[slots]
+        self._n_lost -= int(self._lost[slots].sum())
+        self._n_on_screen -= int(self._on_screen[slots].sum())
+        self._aoi_counts -= self._hits[slots].sum(axis=0)
+        self._n_any_hit -= int(self._any_hit[slots].sum())
+        self._sum_x -= float(self._x[slots][kept].sum())
+        self._sum_y -= float(self._y[slots][kept].sum())
+        np.subtract.at(self._heatmap, self._bin[slots][self._on_screen[slots]], 1)
+
+    @property
+    def n_window(self):
+        '''Number of samples in the window.'''
+
+        return self._filled
+
+    @property
+    def track_loss(self):
+        '''Percentage of the samples of the window with missing coordinates.'''
+
+        return self._n_lost / self._filled * 100 if self._filled else np.nan
+
+    @property
+    def percent_on_screen(self):
+        '''Percentage of the samples of the window on the screen.'''
+
+        return self._n_on_screen / self._filled * 100 if self._filled else np.nan
+
+    @property
+    def percent_in_aoi(self):
+        '''Percentage of the on-screen samples of the window in each AOI.'''
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self._aoi_counts / self._n_on_screen * 100
+
+    @property
+    def percent_any_aoi(self):
+        '''Percentage of the on-screen samples of the window in at least one AOI.'''
+
+        return self._n_any_hit / self._n_on_screen * 100 if self._n_on_screen else np.nan
+
+    @property
+    def mean_position(self):
+        '''Mean (x, y) position of the samples of the window that are not lost.'''
+
+        n_kept = self._filled - self._n_lost
+        return (self._sum_x / n_kept, self._sum_y / n_kept) if n_kept else (np.nan, np.nan)
+
+    @property
+    def heatmap(self):
+        '''Number of on-screen samples of the window in each bin, of shape (bins_y, bins_x), top row first.'''
+
+        heatmap = self._heatmap.reshape(self.bins[1], self.bins[0]).view()
+        heatmap.flags.writeable = False
+        return heatmap
+
+    def summary(self):
+        '''
+        Current statistics of the window.
+
+        Returns:
+        --------
+        summary : dict
+            'time', 'n_samples', 'n_window', 'track_loss', 'percent_on_screen',
+            'percent_in_aoi', 'percent_any_aoi', 'mean_position' and 'last_update_seconds'.
+        '''
+
+        return {'time': self.last_time,
+                'n_samples': self.n_samples,
+                'n_window': self.n_window,
+                'track_loss': self.track_loss,
+                'percent_on_screen': self.percent_on_screen,
+                'percent_in_aoi': self.percent_in_aoi,
+                'percent_any_aoi': self.percent_any_aoi,
+                'mean_position': self.mean_position,
+                'last_update_seconds': self.last_update_seconds}
+
+def _parse_lines(lines, skip_malformed=False):
+    '''Parse lines of "time x y" samples, separated by spaces, tabs or commas; "." is missing.'''
+
+    fields = [line.replace(b',', b' ').split() for line in lines]
+    malformed = [line for line, values in zip(lines, fields) if len(values) != 3]
+
+    if malformed and not skip_malformed:
+        raise ValueError(f'Every sample line should have three values: time, x and y, got {malformed[0]!r}')
+
+    tokens = np.array([token for values in fields if len(values) == 3 for token in values], dtype=bytes)
+    tokens[tokens == b'.'] = b'nan'
+    values = tokens.astype(float).reshape(-1, 3)
+
+    return {'time': values[:, 0], 'xpos': values[:, 1], 'ypos': values[:, 2]}
+
+def socket_samples(address, timeout=None, buffer_size=65536, skip_malformed=False):
+    """
+    Read a live stream of samples from a TCP socket, in batches.
+
+    The tracker, or a bridge program, sends one sample per line as "time x y", separated by
+    spaces, tabs or commas, with "nan" or "." for missing coordinates. Each batch holds all
+    the complete lines received so far, so the batches follow the pace of the stream and
+    never wait for a fixed number of samples. The stream ends when the sender closes the
+    connection.
+
+    Parameters:
+    -----------
+    address : tuple
+        (host, port) of the sender.
+    timeout : float, optional
+        Seconds to wait for data before raising socket.timeout; by default, wait forever.
+    buffer_size : int, optional
+        Maximum number of bytes read at once.
+    skip_malformed : bool, optional
+        Skip lines without exactly three values, e.g. truncated by the sender, instead of
+        raising a ValueError.
+
+    Yields:
+    -------
+    samples : dict of np.array
+        'time', 'xpos' and 'ypos' of the samples received.
+    """
+
+    with socket.create_connection(address, timeout=timeout) as connection:
+        pending = b''
+        while True:
+            received = connection.recv(buffer_size)
+            if not received:
+                break
+
+            # keep the last, possibly incomplete, line for the next batch
+            lines = (pending + received).split(b'\n')
+            pending = lines.pop()
+            lines = [line for line in lines if line.strip()]
+            if lines:
+                yield _parse_lines(lines, skip_malformed)
+
+        if pending.strip():
+            yield _parse_lines([pending], skip_malformed)
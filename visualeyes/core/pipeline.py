@@ -0,0 +1,340 @@
+import collections
+import functools
+import hashlib
+import numbers
+import os
+import pickle
+import types
+import numpy as np
+import pandas as pd
+
+def _update_hash(digest, obj):
+    '''Feed the content of obj into a hashlib digest, tagging every value with its type.'''
+
+    digest.update(type(obj).__name__.encode())
+
+    if isinstance(obj, pd.DataFrame):
+        digest.update(repr(list(obj.columns)).encode())
+        digest.update(repr([str(dtype) for dtype in obj.dtypes]).encode())
+        digest.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+
+    elif isinstance(obj, pd.Series):
+        digest.update(repr((obj.name, str(obj.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+
+    elif isinstance(obj, np.ndarray):
+        digest.update(repr((str(obj.dtype), obj.shape)).encode())
+        if obj.dtype == object:
+            for item in obj.ravel():
+                _update_hash(digest, item)
+        else:
+            digest.update(np.ascontiguousarray(obj).tobytes())
+
+    elif isinstance(obj, dict):
+        digest.update(str(len(obj)).encode())
+        for key in sorted(obj, key=repr):
+            _update_hash(digest, key)
+            _update_hash(digest, obj[key])
+
+    elif isinstance(obj, (list, tuple)):
+        digest.update(str(len(obj)).encode())
+        for item in obj:
+            _update_hash(digest, item)
+
+    elif obj is None or isinstance(obj, (str, bytes, numbers.Number, np.generic)):
+        digest.update(repr(obj).encode())
+
+    else:
+        digest.update(pickle.dumps(obj))
+
+def content_hash(obj):
+    '''
+    Hash the content of a value, e.g. a dataframe, an array, or AOI definitions.
+
+    Equal content gives equal hashes, whatever the identity of the objects.
+
+    Parameters:
+    -----------
+    obj : object
+        Dataframes, series, arrays, dicts, lists, tuples, scalars, or any picklable object,
+        nested in any way.
+
+    Returns:
+    --------
+    hash : str
+        Hexadecimal digest of the content.
+    '''
+
+    digest = hashlib.blake2b(digest_size=20)
+    _update_hash(digest, obj)
+
+    return digest.hexdigest()
+
+def _code_signature(code):
+    '''Hash a code object, recursing into the code of nested functions and comprehensions.'''
+
+    # the repr of a nested code object holds its memory address, so hash its content instead
+    consts = [_code_signature(const) if isinstance(const, types.CodeType) else const for const in code.co_consts]
+
+    return content_hash((code.co_code, consts, code.co_names))
+
+def _code_names(code):
+    '''Global and attribute names used by a code object and the code nested in it, in order.'''
+
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names += _code_names(const)
+
+    return list(dict.fromkeys(names))
+
+def _function_signature(func, _signatures=None):
+    '''Identify a stage function by its name, bytecode, default arguments, closure and the functions it calls.'''
+
+    # signatures of the functions already reached from the stage function
+    if _signatures is None:
+        _signatures = {}
+
+    if isinstance(func, functools.partial):
+        return content_hash((_function_signature(func.func, _signatures), func.args, func.keywords))
+
+    name = f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+    code = getattr(func, '__code__', None)
+
+    if code is None:
+        return name
+
+    if func in _signatures:
+        return _signatures[func]
+
+    # a function reached again through its own calls, directly or not, is identified by its name
+    _signatures[func] = name
+
+    def signature(value):
+        is_function = isinstance(value, (types.FunctionType, functools.partial))
+        return _function_signature(value, _signatures) if is_function else value
+
+    # functions in defaults and closures are identified the same way, anything else by content
+    try:
+        closure = [cell.cell_contents for cell in func.__closure__ or ()]
+        values_hash = content_hash([signature(value) for value in closure + [func.__defaults__, func.__kwdefaults__]])
+    except Exception as error:
+        raise ValueError(f'The default arguments or closure of {name} cannot be hashed') from error
+
+    # module-level functions called by name, e.g. the helpers of a visualeyes function, so that
+    # changing them changes the key too
+    called = [_function_signature(func.__globals__[global_name], _signatures) for global_name in _code_names(code)
+              if isinstance(func.__globals__.get(global_name), types.FunctionType)]
+
+    _signatures[func] = name + content_hash((_code_signature(code), values_hash, called))
+
+    return _signatures[func]
+
+class Pipeline:
+    """
+    Dependency graph of processing stages with content-hash keyed memoization.
+
+    Inputs are values set with `set_input`, e.g. raw samples, AOI definitions or epoch
+    windows. Stages are functions of inputs and of other stages. The key of an input is the
+    hash of its content; the key of a stage is the hash of its function and of the keys of
+    its dependencies. Results are cached by key, so changing an input only recomputes the
+    stages that depend on it, and changing it back reuses the cached results.
+
+    Results are kept in memory, evicting the least recently used ones beyond `cache_size`,
+    and optionally pickled to `cache_dir` so they survive between sessions.
+
+    The key of a stage function covers its bytecode, default arguments and closure, and those
+    of the functions it calls by their global name, recursively, e.g. the helpers of a
+    visualeyes function. Code reached otherwise is not covered: methods of classes, functions
+    called as module attributes (e.g. `np.mean`), and compiled extensions. Clear `cache_dir`
+    after upgrading numpy, pandas or another dependency of the stages, since the pickled
+    results would still match their keys.
+
+    Example:
+    --------
+    >>> pipe = Pipeline()
+    >>> pipe.set_input('samples', samples)
+    >>> pipe.set_input('aois', aoi_definitions)
+    >>> pipe.set_input('screen', screen_dimensions)
+    >>> pipe.add_stage('mask', define_aoi, 'screen', 'aois')
+    >>> pipe.add_stage('percent', percent_data_in_aoi, 'samples', 'mask', 'screen')
+    >>> pipe.get('percent')
+    >>> pipe.set_input('aois', new_aoi_definitions)
+    >>> pipe.get('percent')  # recomputes the mask and the percentage only
+
+    Parameters:
+    -----------
+    cache_size : int, optional
+        Number of results kept in memory.
+    cache_dir : str, optional
+        Directory to also store the results in.
+    """
+
+    def __init__(self, cache_size=128, cache_dir=None):
+
+        if not isinstance(cache_size, numbers.Integral) or cache_size < 1:
+            raise ValueError('cache_size should be a positive integer')
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self.last_computed = []
+
+        self._inputs = {}
+        self._stages = {}
+        self._keys = {}
+        self._cache = collections.OrderedDict()
+
+    def set_input(self, name, value):
+        '''
+        Set or replace an input of the pipeline.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the input
+        value : object
+            Value of the input, hashed once here
+        '''
+
+        if name in self._stages:
+            raise ValueError(f'{name} is already a stage')
+
+        self._inputs[name] = (content_hash(value), value)
+        self._keys.clear()
+
+    def add_stage(self, name, func, *args, **kwargs):
+        '''
+        Add a stage computing func from other inputs or stages.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the stage
+        func : callable
+            Function computing the stage
+        *args, **kwargs : str
+            Names of the inputs or stages passed to func as positional and keyword arguments
+        '''
+
+        if name in self._inputs:
+            raise ValueError(f'{name} is already an input')
+
+        if not callable(func):
+            raise ValueError('func should be callable')
+
+        dependencies = list(args) + list(kwargs.values())
+        if any(not isinstance(dependency, str) for dependency in dependencies):
+            raise ValueError('stage arguments should be names of inputs or stages')
+
+        self._stages[name] = (func, args, kwargs)
+        self._keys.clear()
+
+        # check for cycles through the new stage
+        try:
+            self._check_cycles(name, [])
+        except ValueError:
+            del self._stages[name]
+            raise
+
+    def _check_cycles(self, name, path):
+        if name in path:
+            raise ValueError(f"Cycle between stages: {' -> '.join(path + [name])}")
+
+        if name in self._stages:
+            _, args, kwargs = self._stages[name]
+            for dependency in list(args) + list(kwargs.values()):
+                self._check_cycles(dependency, path + [name])
+
+    def key(self, name):
+        '''
+        Key of an input or stage, which changes whenever its content or one of its dependencies changes.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the input or stage
+
+        Returns:
+        --------
+        key : str
+        '''
+
+        if name in self._inputs:
+            return self._inputs[name][0]
+
+        if name not in self._stages:
+            raise KeyError(f'Unknown input or stage: {name}')
+
+        # stage keys only change when an input or a stage is set
+        if name not in self._keys:
+            func, args, kwargs = self._stages[name]
+            self._keys[name] = content_hash((name, _function_signature(func),
+                                             [self.key(arg) for arg in args],
+                                             {keyword: self.key(arg) for keyword, arg in kwargs.items()}))
+
+        return self._keys[name]
+
+    def get(self, name):
+        '''
+        Value of an input or stage, computing only the stages whose keys are not cached.
+
+        The names of the stages computed by the call are listed in `last_computed`.
+
+        Parameters:
+        -----------
+        name : str
+            Name of the input or stage
+
+        Returns:
+        --------
+        value : object
+        '''
+
+        self.last_computed = []
+
+        return self._get(name)
+
+    def _get(self, name):
+
+        if name in self._inputs:
+            return self._inputs[name][1]
+
+        key = self.key(name)
+
+        # memory cache, marking the entry as recently used
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        # disk cache
+        path = os.path.join(self.cache_dir, key + '.pkl') if self.cache_dir is not None else None
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+
+        else:
+            func, args, kwargs = self._stages[name]
+            value = func(*[self._get(arg) for arg in args],
+                         **{keyword: self._get(arg) for keyword, arg in kwargs.items()})
+            self.last_computed.append(name)
+
+            if path is not None:
+                # write then rename, so that a concurrent reader never sees a partial file
+                temporary_path = f'{path}.{os.getpid()}.tmp'
+                with open(temporary_path, 'wb') as file:
+                    pickle.dump(value, file)
+                os.replace(temporary_path, path)
+
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        '''Empty the memory cache; the disk cache is left untouched.'''
+
+        self._cache.clear()
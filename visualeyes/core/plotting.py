@@ -1,9 +1,8 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import os
-from ._utility import (dataframe_validation, aoi_definitions_validation, screen_dimensions_validation)
-import numbers
+from ._utility import (dataframe_validation, aoi_definitions_validation, screen_dimensions_validation,
+                       bins_validation, data_validation, data_columns, data_column)
 
 def plot_as_scatter(data, screen_dimensions, aoi_definitions=None, save_png=None, save_path=None, marker_size=60):
     """
@@ -11,16 +10,18 @@ def plot_as_scatter(data, screen_dimensions, aoi_definitions=None, save_png=None
 
     Parameters:
     ----------
-    data: pd.DataFrame
+    data: pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.ndarray
         The data to be plotted. Must contain 'xpos' and 'ypos' columns or 'axp' and 'ayp' columns.
     screen_dimensions: tuple
         The dimensions of the screen in pixels (height, width).
     aoi_definitions: dict, list of dict, or None
         The AOI definitions to overlay on the plot. Each dict should contain:
-        - 'shape': 'rectangle' or 'circle'.
+        - 'shape': 'rectangle', 'circle', 'ellipse' or 'polygon'.
         - 'coordinates': tuple, list or np.ndarray of coordinates.
             - for rectangluar AOI's: (x1, x2, y1, y2), upper-bounds non-inclusive. 
             - for circlular AOI's: (x_center, y_center, radius).
+            - for elliptical AOI's: (x_center, y_center, semi_axis_x, semi_axis_y[, angle]).
+            - for polygonal AOI's: a sequence of (x, y) vertices.
     save_png: bool or None
         Whether to save the plot as a PNG file.
     save_path: str or None
@@ -32,15 +33,15 @@ def plot_as_scatter(data, screen_dimensions, aoi_definitions=None, save_png=None
         The figure and axes objects of the plot.    
     """
 
-    # check if input data is a pd.DataFrame
-    if not isinstance(data, pd.DataFrame):
-        raise ValueError("Input data should be a pandas dataframe")
+    # check the type of the input data
+    data_validation(data)
+    columns = data_columns(data)
     
     # check if screen_dimensions is valid
     screen_dimensions_validation(screen_dimensions)
     
     # validate the input dataframe and save the x and y coordinates if the dataframe is valid
-    (x_coord, y_coord), _, _ = dataframe_validation(data, screen_dimensions, drop_outlier=True)
+    (x_coord, y_coord), _ = dataframe_validation(data, screen_dimensions)
 
     # Validate the AOI definitions
     if aoi_definitions is not None:
@@ -58,25 +59,22 @@ def plot_as_scatter(data, screen_dimensions, aoi_definitions=None, save_png=None
     # Set the x-axis to the top
 
    # if the data contains 'axp' and 'ayp' columns, plot the data with varying marker sizes
-    if 'axp' in data.columns and 'ayp' in data.columns:
+    if 'axp' in columns and 'ayp' in columns:
         
         # calculate the fixation duration
-        fixation_duration = []
-        
-        for _, series in data.iterrows():
-            single_duration = series['etime'] - series['stime']
-            fixation_duration.append(single_duration)
+        fixation_duration = data_column(data, 'etime') - data_column(data, 'stime')
             
         # find a scaling factor for the marker size
         max_duration = round(max(fixation_duration), 2)
-        mag_factor = [duration/max_duration for duration in fixation_duration]
+        mag_factor = fixation_duration / max_duration
         
         # plot the data
-        ax.scatter(data['axp'], data['ayp'], color='skyblue', marker='o', 
-                   facecolors='none', s=[3 * marker_size * mag for mag in mag_factor]) 
+        ax.scatter(data_column(data, 'axp'), data_column(data, 'ayp'), color='skyblue', marker='o', 
+                   facecolors='none', s=3 * marker_size * mag_factor) 
 
-        # plot the data with a fixed marker size
-    plt.scatter(y=data['ypos'], x=data['xpos'], color='skyblue', marker='o', s=marker_size) 
+    # plot the data with a fixed marker size
+    if 'xpos' in columns and 'ypos' in columns:
+        plt.scatter(y=data_column(data, 'ypos'), x=data_column(data, 'xpos'), color='skyblue', marker='o', s=marker_size) 
 
     # optionally, overlay aoi
     if aoi_definitions is not None:
@@ -101,7 +99,7 @@ def overlay_aoi(aoi_definitions, screen_dimensions, ax):
     ----------
     aoi_definitions: list of dict
         List of dictionaries defining the AOIs. Each dictionary should contain:
-        - 'shape': 'rectangle' or 'circle'.
+        - 'shape': 'rectangle', 'circle', 'ellipse' or 'polygon'.
         - 'coordinates': list, tuple, or np.ndarray of coordinates.
     screen_dimensions: tuple
         The dimensions of the screen in pixels (height, width).
@@ -143,6 +141,32 @@ def overlay_aoi(aoi_definitions, screen_dimensions, ax):
             
             # Plot circle boundary on the axes
             ax.plot(x, y, color='red', lw=1)
+        
+        elif shape == 'ellipse':
+            
+            x_center, y_center, semi_axis_x, semi_axis_y = coordinates[:4]
+            angle = np.deg2rad(coordinates[4]) if len(coordinates) == 5 else 0
+            
+            # Calculate ellipse boundary points, then rotate them around the center
+            theta = np.linspace(0, 2 * np.pi, 100)
+            u = semi_axis_x * np.cos(theta)
+            v = semi_axis_y * np.sin(theta)
+            x = x_center + u * np.cos(angle) - v * np.sin(angle)
+            y = y_center + u * np.sin(angle) + v * np.cos(angle)
+            
+            # Plot ellipse boundary on the axes
+            ax.plot(x, y, color='red', lw=1)
+        
+        elif shape == 'polygon':
+            
+            vertices = np.asarray(coordinates)
+            
+            # Close the polygon by repeating the first vertex
+            x = np.append(vertices[:, 0], vertices[0, 0])
+            y = np.append(vertices[:, 1], vertices[0, 1])
+            
+            # Plot polygon boundary on the axes
+            ax.plot(x, y, color='red', lw=1)
 
     return ax
 
@@ -151,7 +175,7 @@ def plot_heatmap(data, screen_dimensions, aoi_definitions=None, bins=None):
     Plots a heatmap of eye-tracking data and overlays AOIs if defined.
 
     Parameters:
-    - data: DataFrame containing 'xpos' and 'ypos' for plotting.
+    - data: DataFrame (pandas or Polars), Arrow table or dict of arrays containing 'xpos' and 'ypos' for plotting.
     - screen_dimensions: Tuple of (screen_height, screen_width).
     - aoi_definitions: List of dictionaries defining the AOIs (optional).
     - bins: Either an integer specifying the number of bins for both dimensions,
@@ -162,24 +186,18 @@ def plot_heatmap(data, screen_dimensions, aoi_definitions=None, bins=None):
     screen_height, screen_width = screen_dimensions
     screen_dimensions_validation(screen_dimensions)
 
-    # Validate the data
-    (x_coord, y_coord), _, _ = dataframe_validation(data, screen_dimensions, drop_outlier=True)
+    # Validate the data; outliers are dropped from the coordinates only, without copying the rest of the data
+    (x_coord, y_coord), _ = dataframe_validation(data)
+    on_screen = (x_coord >= 0) & (x_coord < screen_width) & (y_coord >= 0) & (y_coord < screen_height)
+    x_coord, y_coord = x_coord[on_screen], y_coord[on_screen]
 
     
     # Validate the AOI definitions
     if aoi_definitions is not None:
         aoi_definitions_validation(aoi_definitions, screen_dimensions)
 
-    # Determine bins (depends a bit on screen)
-    if bins is None:  # Default bins, 20 px bins here if nothing else is given
-        bins_x = int(screen_width / 10)
-        bins_y = int(screen_height / 10)
-    elif isinstance(bins, numbers.Integral):  # User-defined, if bins for x and y are the same
-        bins_x = bins_y = bins
-    elif isinstance(bins, (tuple, list, np.ndarray)) and len(bins) == 2:  # User-defined, if different bins for x and y are desired
-        bins_x, bins_y = bins
-    else:
-        raise ValueError("`bins` must be an integer or a tuple of two integers.")
+    # Determine bins (depends a bit on screen), one bin per 10 px if nothing else is given
+    bins_x, bins_y = bins_validation(bins, screen_dimensions)
 
     # Initialize the plot
     fig, ax = plt.subplots()
@@ -2,37 +2,50 @@ import numpy as np
 import pandas as pd
 import numbers
 from ._utility import (aoi_mask_validation, dataframe_validation, 
-                      aoi_definitions_validation, screen_dimensions_validation)
+                      aoi_definitions_validation, screen_dimensions_validation,
+                      data_validation, data_columns, data_column, data_length, take_rows)
+from ._geometry import aoi_bounding_box, points_in_aoi, pixel_coordinates
 
-def epoch_data(eye_data, window_start, window_duration):
+def epoch_data(eye_data, window_start, window_duration, output=None):
     '''
     Create epochs of data based on given window size
     
     Parameters:
     -----------
-    eye_data : pd.DataFrame
+    eye_data : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
         Data from eyelinkio output to be epoched
     window_start : int/float or list of int/float
         Start of the window(s)
     window_duration : int/float, or a list of int/float
         Duration of the window(s)
+    output : 'pandas' or 'numpy', optional
+        Format of the epoched data. By default, a pandas dataframe for pandas input and 
+        a dictionary of numpy arrays for any other input.
         
     Returns:
     --------
     epochs : list
         List of epochs
-    epoch_data : pd.DataFrame
+    epoch_data : pd.DataFrame or dict of np.array
         Data epoched based on the given window size
     '''
     
-    # check if data is a dataframe
-    if not isinstance(eye_data, pd.DataFrame):
-        raise ValueError('data should be a pandas dataframe')
+    # check the type of the data
+    data_validation(eye_data)
     
     # check if eye_data contains time column
-    if 'time' not in eye_data.columns:
+    if 'time' not in data_columns(eye_data):
         raise ValueError('data should contain a time column')
     
+    # check the output format
+    if output is None:
+        output = 'pandas' if isinstance(eye_data, pd.DataFrame) else 'numpy'
+    
+    if output not in ['pandas', 'numpy']:
+        raise ValueError("output should be 'pandas' or 'numpy'")
+    
+    time = data_column(eye_data, 'time')
+    
     # window_start must be either a list, a numpy array, or a single value
     if not isinstance(window_start, (list, np.ndarray, numbers.Integral, numbers.Real)):
         raise ValueError('window_start should be a list, a numpy array, or a single value')
@@ -71,10 +84,10 @@ def epoch_data(eye_data, window_start, window_duration):
 
     # the end of the last window should be equal or less than the last time in the data
     if isinstance(window_duration, (list, np.ndarray)):
-        if window_start[-1] + window_duration[-1] > eye_data['time'].iloc[-1]:
+        if window_start[-1] + window_duration[-1] > time[-1]:
             raise ValueError('the end of the last window should be equal or less than the last time in the data')
     elif isinstance(window_duration, (numbers.Integral, numbers.Real)):
-        if window_start[-1] + window_duration > eye_data['time'].iloc[-1]:
+        if window_start[-1] + window_duration > time[-1]:
             raise ValueError('the end of the last window should be equal or less than the last time in the data')
         
     # create epochs of data
@@ -91,32 +104,34 @@ def epoch_data(eye_data, window_start, window_duration):
         else:
             end_time = window_start[start] + window_duration
             
-        # get data within the window
+        # get the positions of the data within the window
         # inclusive of the start time and exclusive of the end time
-        data = eye_data[(eye_data['time'] >= start_time) & (eye_data['time'] < end_time)] 
+        rows = np.flatnonzero((time >= start_time) & (time < end_time))
         
-        # append the data to the list
-        epoch_data.append(data)
+        # append the positions to the list
+        epoch_data.append(rows)
         
         # append the start and end of the window to the list
         epochs.append((start_time, end_time))
         
-        num_samples = len(data)
-        epoch_index.append([start]*num_samples)
+        epoch_index.append(np.full(len(rows), start))
         
-    # convert epoch_data to a single dataframe, including all the original columns
-    # and add a column for the epoch number, and the start and end of the epoch
-    epoch_data = pd.concat(epoch_data)
+    # select the data of all epochs at once, including all the original columns
+    epoch_data = take_rows(eye_data, np.concatenate(epoch_data))
+    if output == 'pandas' and not isinstance(epoch_data, pd.DataFrame):
+        epoch_data = pd.DataFrame(epoch_data)
+    elif output == 'numpy' and isinstance(epoch_data, pd.DataFrame):
+        epoch_data = {name: epoch_data[name].to_numpy() for name in epoch_data.columns}
     
-    # epoch_index contains sublists, convert it to a single list
-    epoch_index = [item for sublist in epoch_index for item in sublist]
+    # epoch_index contains one array per epoch, convert it to a single array
+    epoch_index = np.concatenate(epoch_index)
     
     # check if epoch_index has the same length as epoch_data
-    if len(epoch_index) != len(epoch_data):
+    if len(epoch_index) != data_length(epoch_data):
         raise ValueError('epoch_index should have the same length as epoch_data')
     
     # check if unique epoch_index is the same as the number of epochs
-    if len(set(epoch_index)) != len(epochs):
+    if len(np.unique(epoch_index)) != len(epochs):
         raise ValueError('epoch_index should have the same length as epochs')
     
     # add epoch_index to the epoch_data
@@ -124,7 +139,7 @@ def epoch_data(eye_data, window_start, window_duration):
     
     return epochs, epoch_data
 
-def define_aoi(screen_dimensions, aoi_definitions):
+def define_aoi(screen_dimensions, aoi_definitions, dtype=np.uint8):
     """
     Define Areas of Interest (AOIs).
     
@@ -135,10 +150,17 @@ def define_aoi(screen_dimensions, aoi_definitions):
         
     aoi_definitions : dict or a list of dict
         Each dictionary defines one AOI (so we can have multiple) with keys:
-        - 'shape': 'rectangle' or 'circle'.
+        - 'shape': 'rectangle', 'circle', 'ellipse' or 'polygon'.
         - 'coordinates': Tuple of coordinates:
             - For rectangluar AOI's: (x1, x2, y1, y2), upper-bounds non-inclusive. 
             - For circlular AOI's: (x_center, y_center, radius).
+            - For elliptical AOI's: (x_center, y_center, semi_axis_x, semi_axis_y), 
+              optionally followed by a rotation angle in degrees.
+            - For polygonal AOI's: a sequence of at least three (x, y) vertices.
+    
+    dtype : np.uint8 or bool, optional
+        Data type of the mask. Both use one byte per pixel and give the same results in 
+        `percent_data_in_aoi`; a bool mask skips the binary check during validation.
         
     Returns:
     --------
@@ -149,13 +171,20 @@ def define_aoi(screen_dimensions, aoi_definitions):
     # validate screen_dimensions
     screen_dimensions_validation(screen_dimensions)
     
+    # validate dtype
+    if np.dtype(dtype) not in (np.dtype(np.uint8), np.dtype(bool)):
+        raise ValueError('dtype should be np.uint8 or bool')
+    
     # validate aoi_definitions
     aoi_definitions_validation(aoi_definitions, screen_dimensions)
 
     # Initialize a mask
     # mask is a 2D numpy array with the same dimensions as the screen
     screen_height, screen_width = screen_dimensions
-    mask = np.zeros((screen_height, screen_width), dtype=np.uint8)
+    mask = np.zeros((screen_height, screen_width), dtype=dtype)
+
+    if isinstance(aoi_definitions, dict):
+        aoi_definitions = [aoi_definitions]
 
     # Define each AOI
     for aoi in aoi_definitions:
@@ -168,21 +197,67 @@ def define_aoi(screen_dimensions, aoi_definitions):
             x1, x2, y1, y2 = map(int, coordinates) 
          
             # All pixels within the rectangle are 1
-            mask[y1:y2, x1:x2] = 1  
+            mask[y1:y2, x1:x2] = True  
             
-        elif shape == 'circle':
+        else:
             
-            # Convert input coordinates to integers
-            x_center, y_center, radius = map(int, coordinates) 
+            # Only rasterize the pixels within the bounding box of the AOI
+            x_min, x_max, y_min, y_max = aoi_bounding_box(aoi)
+            x_start, x_stop = max(int(np.floor(x_min)), 0), min(int(np.ceil(x_max)) + 1, screen_width)
+            y_start, y_stop = max(int(np.floor(y_min)), 0), min(int(np.ceil(y_max)) + 1, screen_height)
             
             # Create a grid of x and y coordinates
-            y, x = np.ogrid[:screen_height, :screen_width] 
+            y, x = np.ogrid[y_start:y_stop, x_start:x_stop] 
             
-            # Set all pixels within the circle to 1
-            mask[(x - x_center)**2 + (y - y_center)**2 <= radius**2] = 1 
+            # Set all pixels within the AOI to 1
+            mask[y_start:y_stop, x_start:x_stop] |= points_in_aoi(x, y, aoi)
     
     return mask
 
+def aoi_hits(df, aoi_definitions, screen_dimensions):
+    """
+    Test every data point against every AOI, without building a screen mask.
+    
+    Data points are floored to pixels first, so the result matches a lookup in the 
+    mask returned by `define_aoi`. Data points outside the screen or with missing 
+    coordinates are never inside an AOI.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Dataframe containing the x and y coordinates of the data points.
+    aoi_definitions : dict or a list of dict
+        AOI definitions, as accepted by `define_aoi`.
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    
+    Returns:
+    --------
+    hits : 2D np.array of bool
+        Array of shape (number of data points, number of AOIs).
+    """
+    
+    # validate screen_dimensions
+    screen_dimensions_validation(screen_dimensions)
+    
+    # validate aoi_definitions
+    aoi_definitions_validation(aoi_definitions, screen_dimensions)
+    
+    if isinstance(aoi_definitions, dict):
+        aoi_definitions = [aoi_definitions]
+    
+    # get the x and y coordinates of the data points, keeping every row
+    (x_coord, y_coord), _ = dataframe_validation(df, drop_nan=False)
+    
+    x_coord, y_coord, valid_mask = pixel_coordinates(x_coord, y_coord, screen_dimensions)
+    
+    hits = np.zeros((len(x_coord), len(aoi_definitions)), dtype=bool)
+    
+    for idx, aoi in enumerate(aoi_definitions):
+        hits[valid_mask, idx] = points_in_aoi(x_coord[valid_mask], y_coord[valid_mask], aoi)
+    
+    return hits
+
 def percent_data_in_aoi(df, aoi_mask, screen_dimensions):
     
     """
@@ -190,7 +265,7 @@ def percent_data_in_aoi(df, aoi_mask, screen_dimensions):
     
     Parameters:
     -----------
-    df : pd.DataFrame
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
         Dataframe containing the x and y coordinates of the data points.
     aoi_mask : 2D np.array
         Binary mask of the AOI.
@@ -209,17 +284,63 @@ def percent_data_in_aoi(df, aoi_mask, screen_dimensions):
     # validate aoi_mask
     aoi_mask_validation(aoi_mask, screen_dimensions)
     
-    # get the x and y coordinates of the data points
-    coords, _, _ = dataframe_validation(df, screen_dimensions, drop_outlier=True)
-
-    valid_mask = ~np.isnan(coords[0]) & ~np.isnan(coords[1])
-    x_coord = np.floor(coords[0][valid_mask]).astype(int)
-    y_coord = np.floor(coords[1][valid_mask]).astype(int)
+    # get the x and y coordinates of the data points; outliers and missing values are
+    # masked out on the coordinates, without copying the rest of the data
+    coords, _ = dataframe_validation(df, drop_nan=False)
+    x_pixel, y_pixel, valid_mask = pixel_coordinates(coords[0], coords[1], screen_dimensions)
+    
+    # the smallest integer type that holds every pixel index; NumPy casts the index 
+    # arrays in buffered chunks, so no full int64 copy is made
+    index_dtype = np.int16 if max(screen_dimensions) <= np.iinfo(np.int16).max else np.int32
+    x_coord = x_pixel[valid_mask].astype(index_dtype)
+    y_coord = y_pixel[valid_mask].astype(index_dtype)
     
     # count the number of data points inside the AOI
-    num_data_in_aoi = np.sum(aoi_mask[y_coord, x_coord])
+    num_data_in_aoi = np.count_nonzero(aoi_mask[y_coord, x_coord])
  
     # calculate the percentage of data points in the AOI
     percent_in_aoi = num_data_in_aoi/ len(x_coord) * 100
     
-    return percent_in_aoi
\ No newline at end of file
+    return percent_in_aoi
+
+def compact_data(df):
+    """
+    Downcast the floating-point columns of eye-tracking data to save memory.
+    
+    Gaze data from eyelinkio is float64 throughout; downcasting to float32 halves its 
+    footprint. The 'time' column is left untouched, since float32 cannot resolve the 
+    samples of long recordings. Missing values are kept as NaN.
+    
+    Every pixel coordinate is exactly representable in float32, so AOI statistics on 
+    compacted data are identical to those on the original data, except for samples 
+    that lie within float32 rounding (about 1e-4 pixels on a 2000 pixel screen) below 
+    a pixel boundary, which may be rounded onto the next pixel.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Eye-tracking data.
+    
+    Returns:
+    --------
+    df : pd.DataFrame or dict of np.array
+        Data with the float64 columns other than 'time' downcast to float32: a copy for a 
+        pandas dataframe, and a dictionary of numpy arrays for any other input, whose 
+        other columns are read without copying where possible.
+    """
+    
+    # check the type of the data
+    data_validation(df)
+    
+    if isinstance(df, pd.DataFrame):
+        columns = [column for column in df.columns
+                   if column != 'time' and df[column].dtype == np.float64]
+        
+        return df.astype({column: np.float32 for column in columns})
+    
+    compact = {}
+    for name in data_columns(df):
+        column = data_column(df, name)
+        compact[name] = column.astype(np.float32) if name != 'time' and column.dtype == np.float64 else column
+    
+    return compact
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+import numbers
+from ._utility import (dataframe_validation, screen_dimensions_validation, data_validation, data_columns,
+                       data_column, data_length)
+from ._geometry import aoi_bounding_box
+
+def pixels_per_degree(screen_dimensions, screen_width_cm, viewing_distance_cm):
+    '''
+    Number of pixels spanning one degree of visual angle at the center of the screen.
+
+    Parameters:
+    -----------
+    screen_dimensions : tuple
+        Screen dimensions (height, width) in pixels.
+    screen_width_cm : int/float
+        Physical width of the screen in centimeters.
+    viewing_distance_cm : int/float
+        Distance from the eyes to the screen in centimeters.
+
+    Returns:
+    --------
+    pixels_per_degree : float
+    '''
+
+    # validate screen_dimensions
+    screen_dimensions_validation(screen_dimensions)
+
+    if not isinstance(screen_width_cm, numbers.Real) or screen_width_cm <= 0:
+        raise ValueError('screen_width_cm should be a positive number')
+
+    if not isinstance(viewing_distance_cm, numbers.Real) or viewing_distance_cm <= 0:
+        raise ValueError('viewing_distance_cm should be a positive number')
+
+    cm_per_pixel = screen_width_cm / screen_dimensions[1]
+
+    # visual angle subtended by a single pixel
+    degrees_per_pixel = np.degrees(2 * np.arctan(cm_per_pixel / (2 * viewing_distance_cm)))
+
+    return 1 / degrees_per_pixel
+
+def _target_centers(target, n_groups, group_epochs):
+    '''Center of the target of every group, as an (n_groups, 2) array.'''
+
+    def center(single_target):
+        if isinstance(single_target, dict):
+            x_min, x_max, y_min, y_max = aoi_bounding_box(single_target)
+            return (x_min + x_max) / 2, (y_min + y_max) / 2
+
+        if len(single_target) != 2:
+            raise ValueError('target should be an AOI definition or an (x, y) pair')
+
+        return single_target
+
+    # a single target shared by all groups
+    if isinstance(target, dict) or (len(target) == 2 and isinstance(target[0], numbers.Real)):
+        return np.tile(np.asarray(center(target), dtype=float), (n_groups, 1))
+
+    # one target per epoch, looked up through the epoch index of each group
+    if group_epochs is None:
+        raise ValueError('a target per epoch requires grouping by epoch_index')
+
+    centers = np.array([center(single_target) for single_target in target], dtype=float)
+
+    if group_epochs.max() >= len(centers):
+        raise ValueError('target should have one entry per epoch')
+
+    return centers[group_epochs]
+
+def data_quality_metrics(df, group_by='epoch_index', target=None, ppd=None, time_unit=1.0):
+    """
+    Compute data-quality metrics per group of samples, e.g. per epoch and per subject.
+
+    All metrics are computed in a single pass with grouped reductions, without looping over groups.
+    Samples are taken in the order of the dataframe within each group.
+
+    Metrics:
+    - n_samples: number of samples.
+    - data_loss: percentage of samples with missing coordinates.
+    - precision_rms_s2s: root mean square of the distances between consecutive valid samples.
+    - precision_std: standard deviation of the valid samples around their mean position.
+    - accuracy: mean distance between the valid samples and the target (only if `target` is given).
+    - sampling_rate: sampling rate in Hz, from the median interval between consecutive samples.
+    - sampling_jitter: standard deviation of the intervals between consecutive samples, in seconds.
+    Spatial metrics are in pixels (suffix `_px`), and in degrees of visual angle (suffix `_deg`)
+    when `ppd` is given.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Dataframe containing the time and the x and y coordinates of the samples, e.g. the
+        epoched data returned by `epoch_data`.
+    group_by : str, list of str, or None, optional
+        Column(s) to group the samples by, e.g. ['subject', 'epoch_index']. With None, or if the
+        default 'epoch_index' column is absent, the whole dataframe is a single group.
+    target : tuple, dict, or list, optional
+        Target of the accuracy metric: an (x, y) position, an AOI definition (its center is used),
+        or a list of either with one entry per epoch (requires an 'epoch_index' column).
+    ppd : float, optional
+        Pixels per degree of visual angle, to convert the spatial metrics to degrees, see
+        `pixels_per_degree`.
+    time_unit : float, optional
+        Duration of one unit of the time column in seconds, e.g. 0.001 for milliseconds.
+
+    Returns:
+    --------
+    metrics : pd.DataFrame
+        One row per group, indexed by the grouping column(s).
+    """
+
+    # check if data has a time column
+    data_validation(df)
+    columns = data_columns(df)
+
+    if 'time' not in columns:
+        raise ValueError('data should contain a time column')
+
+    if ppd is not None and (not isinstance(ppd, numbers.Real) or ppd <= 0):
+        raise ValueError('ppd should be a positive number')
+
+    # the default grouping falls back to a single group when the data is not epoched
+    if group_by == 'epoch_index' and 'epoch_index' not in columns:
+        group_by = None
+
+    if isinstance(group_by, str):
+        group_by = [group_by]
+
+    if group_by is not None:
+        missing_columns = [column for column in group_by if column not in columns]
+        if missing_columns:
+            raise ValueError(f'Missing grouping columns: {missing_columns}')
+
+    # get the x and y coordinates of the samples, keeping every row
+    (x_coord, y_coord), _ = dataframe_validation(df, drop_nan=False)
+    x_coord = np.asarray(x_coord, dtype=float)
+    y_coord = np.asarray(y_coord, dtype=float)
+    times = np.asarray(data_column(df, 'time'), dtype=float) * time_unit
+
+    # integer group code of every sample
+    if group_by is None:
+        group_codes = np.zeros(data_length(df), dtype=np.intp)
+        group_index = pd.RangeIndex(1)
+    else:
+        group_columns = pd.DataFrame({column: data_column(df, column) for column in group_by})
+        group_codes, group_values = pd.MultiIndex.from_frame(group_columns).factorize()
+        group_index = pd.MultiIndex.from_tuples(list(group_values), names=group_by)
+        if len(group_by) == 1:
+            group_index = group_index.get_level_values(0)
+
+    n_groups = len(group_index)
+
+    # sort the samples by group, keeping the original order within each group
+    order = np.argsort(group_codes, kind='stable')
+    group_codes = group_codes[order]
+    x_coord, y_coord, times = x_coord[order], y_coord[order], times[order]
+
+    valid = ~np.isnan(x_coord) & ~np.isnan(y_coord)
+    x_valid = np.where(valid, x_coord, 0)
+    y_valid = np.where(valid, y_coord, 0)
+
+    def group_sum(values):
+        return np.bincount(group_codes, weights=values, minlength=n_groups)
+
+    n_samples = np.bincount(group_codes, minlength=n_groups)
+    n_valid = group_sum(valid)
+
+    metrics = pd.DataFrame(index=group_index)
+    metrics['n_samples'] = n_samples
+
+    # pairs of consecutive samples within the same group
+    same_group = group_codes[1:] == group_codes[:-1]
+    pair_codes = group_codes[1:][same_group]
+
+    # sample-to-sample precision, over pairs of consecutive valid samples
+    valid_pairs = (valid[1:] & valid[:-1])[same_group]
+    step_squared = (np.diff(x_valid)**2 + np.diff(y_valid)**2)[same_group]
+    n_pairs = np.bincount(pair_codes, weights=valid_pairs, minlength=n_groups)
+    step_sum = np.bincount(pair_codes, weights=np.where(valid_pairs, step_squared, 0), minlength=n_groups)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics['data_loss'] = (1 - n_valid / n_samples) * 100
+        rms_s2s = np.sqrt(step_sum / n_pairs)
+
+        # spread around the mean position of each group
+        x_mean = group_sum(x_valid) / n_valid
+        y_mean = group_sum(y_valid) / n_valid
+        spread = np.where(valid, (x_valid - x_mean[group_codes])**2 + (y_valid - y_mean[group_codes])**2, 0)
+        std = np.sqrt(group_sum(spread) / n_valid)
+
+    metrics['precision_rms_s2s_px'] = rms_s2s
+    metrics['precision_std_px'] = std
+
+    # accuracy, as the mean offset from the target
+    if target is not None:
+        group_epochs = None
+        if group_by is not None and 'epoch_index' in group_by:
+            group_epochs = np.asarray(group_index.to_frame()['epoch_index'] if len(group_by) > 1 else group_index,
+                                      dtype=int)
+
+        centers = _target_centers(target, n_groups, group_epochs)
+        offset = np.sqrt((x_valid - centers[group_codes, 0])**2 + (y_valid - centers[group_codes, 1])**2)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['accuracy_px'] = group_sum(np.where(valid, offset, 0)) / n_valid
+
+    # convert the spatial metrics to degrees of visual angle
+    if ppd is not None:
+        for column in [column for column in metrics.columns if column.endswith('_px')]:
+            metrics[column[:-3] + '_deg'] = metrics[column] / ppd
+
+    # sampling-rate statistics, from the intervals between consecutive samples
+    intervals = np.diff(times)[same_group]
+    n_intervals = np.bincount(pair_codes, minlength=n_groups)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        interval_mean = np.bincount(pair_codes, weights=intervals, minlength=n_groups) / n_intervals
+        interval_spread = (intervals - interval_mean[pair_codes])**2
+        metrics['sampling_jitter'] = np.sqrt(np.bincount(pair_codes, weights=interval_spread, minlength=n_groups) /
+                                             n_intervals)
+
+    # grouped median of the intervals: sort them by group and then by value
+    interval_order = np.lexsort((intervals, pair_codes))
+    sorted_intervals = intervals[interval_order]
+    starts = np.concatenate([[0], np.cumsum(n_intervals)[:-1]])
+    has_intervals = n_intervals > 0
+    lower = sorted_intervals[(starts + (n_intervals - 1) // 2)[has_intervals]]
+    upper = sorted_intervals[(starts + n_intervals // 2)[has_intervals]]
+
+    median_interval = np.full(n_groups, np.nan)
+    median_interval[has_intervals] = (lower + upper) / 2
+
+    with np.errstate(divide='ignore'):
+        metrics['sampling_rate'] = 1 / median_interval
+
+    return metrics
@@ -0,0 +1,259 @@
+import html
+import json
+import numbers
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from ._utility import (data_validation, data_columns, data_column, dataframe_validation,
+                       aoi_definitions_validation, screen_dimensions_validation)
+from ._geometry import pixel_coordinates
+from .loading import read_edf
+from .pipeline import content_hash
+from .processing import aoi_hits
+from .quality import data_quality_metrics
+
+# bump whenever the content of the rendered thumbnails or metrics changes
+_REPORT_VERSION = 1
+
+_MANIFEST = 'manifest.json'
+_THUMBNAILS = 'thumbnails'
+
+def read_samples(path):
+    '''
+    Read the samples of an EDF file as a dataframe.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the EDF file
+
+    Returns:
+    --------
+    samples : pd.DataFrame
+        The samples, as returned by eyelinkio
+    '''
+
+    return read_edf(path).to_pandas()['samples']
+
+def _input_key(data):
+    '''Hash of a subject's data, or of the path, size and modification time of its file.'''
+
+    if isinstance(data, (str, os.PathLike)):
+        status = os.stat(data)
+        return content_hash(('file', os.path.abspath(data), status.st_size, status.st_mtime_ns))
+
+    data_validation(data)
+    if isinstance(data, pd.DataFrame):
+        return content_hash(data)
+
+    return content_hash({name: data_column(data, name) for name in data_columns(data)})
+
+def _init_worker():
+
+    # render off-screen, whatever the backend of the parent process
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+def _render_subject(data, loader, key, thumbnail_dir, screen_dimensions, aoi_definitions, bins, ppd, time_unit, dpi):
+    '''Compute the metrics of one subject and save its thumbnails; runs in a worker process.'''
+
+    import matplotlib.pyplot as plt
+    from .plotting import plot_as_scatter, plot_heatmap
+
+    if isinstance(data, (str, os.PathLike)):
+        data = loader(data)
+
+    if not isinstance(data, pd.DataFrame):
+        data = pd.DataFrame({name: data_column(data, name) for name in data_columns(data)})
+
+    # data quality of the whole recording
+    quality = data_quality_metrics(data, group_by=None, ppd=ppd, time_unit=time_unit)
+    metrics = {name: float(value) for name, value in quality.iloc[0].items()}
+
+    # percentage of the on-screen samples in each AOI, as in `percent_data_in_aoi`
+    if aoi_definitions:
+        (x_coord, y_coord), _ = dataframe_validation(data, drop_nan=False)
+        _, _, valid_mask = pixel_coordinates(x_coord, y_coord, screen_dimensions)
+        hits = aoi_hits(data, aoi_definitions, screen_dimensions)[valid_mask]
+        n_valid = len(hits) if len(hits) else np.nan
+        for index, count in enumerate(hits.sum(axis=0)):
+            metrics[f'percent_aoi_{index}'] = float(count / n_valid * 100)
+        metrics['percent_any_aoi'] = float(hits.any(axis=1).sum() / n_valid * 100)
+
+    thumbnails = {}
+    for kind, plot in [('heatmap', plot_heatmap), ('scatter', plot_as_scatter)]:
+        if kind == 'heatmap':
+            fig, _ = plot(data, screen_dimensions, aoi_definitions, bins=bins)
+        else:
+            fig, _ = plot(data, screen_dimensions, aoi_definitions)
+
+        thumbnails[kind] = f'{key}_{kind}.png'
+        fig.savefig(os.path.join(thumbnail_dir, thumbnails[kind]), dpi=dpi)
+        plt.close(fig)
+
+    return {'key': key, 'metrics': metrics, 'thumbnails': thumbnails}
+
+def _write_atomic(path, text):
+
+    # write then rename, so that a reader never sees a partial file
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(temporary_path, path)
+
+def _format_value(value):
+
+    if value is None or (isinstance(value, numbers.Real) and np.isnan(value)):
+        return ''
+    if isinstance(value, numbers.Real):
+        return f'{value:.0f}' if float(value).is_integer() or abs(value) >= 1000 else f'{value:.3g}'
+    return str(value)
+
+def _report_html(title, summary, entries):
+
+    columns = list(summary.columns)
+    header = ''.join(f'<th>{html.escape(column)}</th>' for column in ['subject'] + columns + ['heatmap', 'scatter'])
+
+    rows = []
+    for subject, values in summary.iterrows():
+        thumbnails = entries[subject]['thumbnails']
+        cells = [f'<td>{html.escape(subject)}</td>']
+        cells += [f'<td>{html.escape(_format_value(values[column]))}</td>' for column in columns]
+        cells += [f'<td><a href="{_THUMBNAILS}/{thumbnails[kind]}"><img src="{_THUMBNAILS}/{thumbnails[kind]}" '
+                  f'alt="{kind} of {html.escape(subject)}" loading="lazy"></a></td>' for kind in ['heatmap', 'scatter']]
+        rows.append(f'<tr>{"".join(cells)}</tr>')
+
+    return ('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{html.escape(title)}</title>\n'
+            '<style>\n'
+            'body { font-family: sans-serif; }\n'
+            'table { border-collapse: collapse; }\n'
+            'th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: right; }\n'
+            'img { width: 160px; }\n'
+            '</style>\n</head>\n<body>\n'
+            f'<h1>{html.escape(title)}</h1>\n'
+            f'<p>{len(rows)} subjects</p>\n'
+            f'<table>\n<thead><tr>{header}</tr></thead>\n<tbody>\n' + '\n'.join(rows) + '\n</tbody>\n</table>\n'
+            '</body>\n</html>\n')
+
+def build_report(subjects, report_dir, screen_dimensions, aoi_definitions=None, bins=None, ppd=None,
+                 time_unit=1.0, loader=read_samples, n_workers=None, title='Data quality report', dpi=40):
+    """
+    Build or update a static HTML report of the data quality of a cohort.
+
+    The report, `index.html` in `report_dir`, has one row per subject with the data-quality
+    metrics of `data_quality_metrics`, the percentage of the samples in each AOI, and heatmap
+    and scatter thumbnails. Each subject is keyed by the content hash of its data (or the path,
+    size and modification time of its file) and of the report settings. Subjects whose key is
+    already in the report are reused as they are; only new or changed subjects are rendered, in
+    parallel worker processes.
+
+    Example:
+    --------
+    >>> subjects = {path.stem: path for path in Path('edf').glob('*.edf')}
+    >>> summary, rendered = build_report(subjects, 'qc_report', screen_dimensions, aoi_definitions)
+
+    Parameters:
+    -----------
+    subjects : dict
+        Data of each subject by subject name: a dataframe, an Arrow table, a Polars dataframe,
+        a dictionary of numpy arrays, or the path of a file read by `loader`.
+    report_dir : str
+        Directory of the report, created if needed.
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    aoi_definitions : dict or list of dict, optional
+        AOIs to compute percentages for and to draw on the thumbnails.
+    bins : int or tuple, optional
+        Bins of the heatmaps, see `plot_heatmap`.
+    ppd : float, optional
+        Pixels per degree of visual angle, e.g. from `pixels_per_degree`, see `data_quality_metrics`.
+    time_unit : float, optional
+        Duration of one unit of the time column in seconds.
+    loader : callable, optional
+        Function reading the data of a subject given as a path, by default `read_samples`.
+        Must be importable by the worker processes, e.g. defined at module level.
+    n_workers : int, optional
+        Number of worker processes, by default the number of processors.
+    title : str, optional
+        Title of the report.
+    dpi : int, optional
+        Resolution of the thumbnails.
+
+    Returns:
+    --------
+    summary : pd.DataFrame
+        Metrics of each subject, indexed by subject name.
+    rendered : list
+        Names of the subjects rendered by this call.
+    """
+
+    # validate the inputs
+    if not isinstance(subjects, dict):
+        raise ValueError('subjects should be a dictionary of data by subject name')
+
+    screen_dimensions_validation(screen_dimensions)
+    screen_dimensions = tuple(screen_dimensions)
+
+    if aoi_definitions is not None:
+        aoi_definitions_validation(aoi_definitions, screen_dimensions)
+        if isinstance(aoi_definitions, dict):
+            aoi_definitions = [aoi_definitions]
+
+    if not callable(loader):
+        raise ValueError('loader should be callable')
+
+    if n_workers is not None and (not isinstance(n_workers, numbers.Integral) or n_workers < 1):
+        raise ValueError('n_workers should be a positive integer')
+
+    subjects = {str(subject): data for subject, data in subjects.items()}
+    thumbnail_dir = os.path.join(report_dir, _THUMBNAILS)
+    os.makedirs(thumbnail_dir, exist_ok=True)
+
+    # subjects already in the report, with the thumbnails they refer to
+    manifest_path = os.path.join(report_dir, _MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as file:
+            previous = json.load(file)
+
+    settings = (_REPORT_VERSION, screen_dimensions, aoi_definitions, bins, ppd, time_unit, dpi)
+    settings_key = content_hash(settings)
+
+    entries = {}
+    pending = {}
+    for subject, data in subjects.items():
+        key = content_hash((_input_key(data), settings_key))
+        entry = previous.get(subject)
+        if (entry is not None and entry['key'] == key and
+                all(os.path.exists(os.path.join(thumbnail_dir, name)) for name in entry['thumbnails'].values())):
+            entries[subject] = entry
+        else:
+            pending[subject] = (data, key)
+
+    # render the new and changed subjects
+    if pending:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(_render_subject, data, loader, key, thumbnail_dir, screen_dimensions,
+                                       aoi_definitions, bins, ppd, time_unit, dpi): subject
+                       for subject, (data, key) in pending.items()}
+            for future in as_completed(futures):
+                entries[futures[future]] = future.result()
+
+    # keep the order of `subjects`, and drop the subjects that are no longer part of it
+    entries = {subject: entries[subject] for subject in subjects}
+    _write_atomic(manifest_path, json.dumps(entries, indent=1))
+
+    # remove the thumbnails of changed and removed subjects
+    current = {name for entry in entries.values() for name in entry['thumbnails'].values()}
+    for name in os.listdir(thumbnail_dir):
+        if name.endswith('.png') and name not in current:
+            os.remove(os.path.join(thumbnail_dir, name))
+
+    summary = pd.DataFrame.from_dict({subject: entry['metrics'] for subject, entry in entries.items()},
+                                     orient='index')
+    summary.index.name = 'subject'
+    _write_atomic(os.path.join(report_dir, 'index.html'), _report_html(title, summary, entries))
+
+    return summary, list(pending)
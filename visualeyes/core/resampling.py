@@ -0,0 +1,294 @@
+import numbers
+import numpy as np
+import pandas as pd
+from ._utility import data_validation, data_columns, data_column
+
+_METHODS = ['mean', 'decimate', 'linear']
+
+def _grid_index(times, scale, rounding):
+    '''Index of the output grid point at or before (floor) or at or after (ceil) each time.'''
+
+    # round away the floating-point error of times that sit exactly on the grid
+    return rounding(np.round(times * scale, 9)).astype(np.int64)
+
+def _segments(columns):
+    '''Contiguous runs of rows of the same epoch, as segment codes and start positions.'''
+
+    n_rows = len(columns['time'])
+
+    if 'epoch_index' in columns and n_rows:
+        epoch_index = columns['epoch_index']
+        changes = np.flatnonzero(epoch_index[1:] != epoch_index[:-1]) + 1
+    else:
+        changes = np.zeros(0, dtype=np.intp)
+
+    starts = np.concatenate([[0], changes]) if n_rows else np.zeros(0, dtype=np.intp)
+    codes = np.zeros(n_rows, dtype=np.intp)
+    codes[changes] = 1
+
+    return np.cumsum(codes), starts
+
+def _check_times(times, segment_codes):
+
+    if np.isnan(times).any():
+        raise ValueError('time should not contain missing values')
+
+    if np.any((np.diff(times) < 0) & (segment_codes[1:] == segment_codes[:-1])):
+        raise ValueError('time should be increasing within each epoch')
+
+def _typical_gap(times, segment_codes):
+    '''Default largest interval to interpolate over: 1.5 times the median sampling interval.'''
+
+    intervals = np.diff(times)[segment_codes[1:] == segment_codes[:-1]]
+    intervals = intervals[intervals > 0]
+
+    return 1.5 * np.median(intervals) if len(intervals) else np.inf
+
+def _bin_columns(columns, scale, method, final):
+    '''Mean-binning or decimation; the rows of the last bin are held back unless final.'''
+
+    times = columns['time']
+    segment_codes, _ = _segments(columns)
+    bins = _grid_index(times, scale, np.floor)
+
+    # rows are ordered by epoch and time, so each (epoch, bin) pair is a run of rows
+    changes = (segment_codes[1:] != segment_codes[:-1]) | (bins[1:] != bins[:-1])
+    starts = np.flatnonzero(np.concatenate([[len(times) > 0], changes]))
+
+    carry_from = len(times) if final or not len(starts) else starts[-1]
+    starts = starts[starts < carry_from]
+    carry = {name: column[carry_from:] for name, column in columns.items()}
+
+    resampled = {}
+    for name, column in columns.items():
+        column = column[:carry_from]
+
+        if name == 'time' and method == 'mean':
+            resampled[name] = bins[starts] / scale
+
+        elif method == 'mean' and np.issubdtype(column.dtype, np.floating):
+            # mean over the non-missing values, a bin of missing values stays missing
+            valid = ~np.isnan(column)
+            sums = np.add.reduceat(np.where(valid, column, 0).astype(np.float64), starts) if len(starts) else np.zeros(0)
+            counts = np.add.reduceat(valid.astype(np.intp), starts) if len(starts) else np.zeros(0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                resampled[name] = (sums / counts).astype(column.dtype)
+
+        else:
+            # decimation, and integer or other non-float columns, keep the first row of each bin
+            resampled[name] = column[starts]
+
+    return resampled, carry
+
+def _interpolate_columns(columns, scale, max_gap, carried, final):
+    '''Linear interpolation on the grid; the last row is held back unless final.'''
+
+    times = columns['time']
+    n_rows = len(times)
+    segment_codes, segment_starts = _segments(columns)
+    segment_ends = np.append(segment_starts[1:], n_rows)[:len(segment_starts)] - 1
+
+    # grid points within the time span of each epoch
+    first_points = _grid_index(times[segment_starts], scale, np.ceil)
+    last_points = _grid_index(times[segment_ends], scale, np.floor)
+    if carried and len(first_points):
+        # grid points up to the carried row were returned with the previous chunk
+        first_points[0] = _grid_index(times[:1], scale, np.floor)[0] + 1
+
+    n_points = np.maximum(last_points - first_points + 1, 0)
+    point_segments = np.repeat(np.arange(len(n_points)), n_points)
+    offsets = np.cumsum(n_points) - n_points
+    grid = first_points[point_segments] + (np.arange(n_points.sum()) - offsets[point_segments])
+    grid_times = grid / scale
+
+    # last row at or before each grid point, within its epoch: merge the rows and the grid
+    # points in (epoch, time) order, rows before grid points on equal times
+    order = np.lexsort((np.concatenate([np.zeros(n_rows), np.ones(len(grid))]),
+                        np.concatenate([times, grid_times]),
+                        np.concatenate([segment_codes, point_segments])))
+    is_row = order < n_rows
+    left = (np.cumsum(is_row)[~is_row] - 1).astype(np.intp)
+    right = np.minimum(left + 1, max(n_rows - 1, 0))
+
+    left_times, right_times = times[left], times[right]
+    exact = grid_times == left_times
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = np.where(exact, 0.0, (grid_times - left_times) / (right_times - left_times))
+    # never interpolate across a gap in the recording
+    in_gap = ~exact & (right_times - left_times > max_gap)
+
+    resampled = {}
+    for name, column in columns.items():
+        if name == 'time':
+            resampled[name] = grid_times.astype(column.dtype) if np.issubdtype(column.dtype, np.floating) else grid_times
+
+        elif np.issubdtype(column.dtype, np.floating):
+            # a missing neighbour makes the interpolated value missing
+            left_values, right_values = column[left], column[right]
+            values = np.where(exact, left_values, left_values + (right_values - left_values) * weights)
+            resampled[name] = np.where(in_gap, np.nan, values).astype(column.dtype)
+
+        else:
+            resampled[name] = column[left]
+
+    carry_from = n_rows if final else max(n_rows - 1, 0)
+    carry = {name: column[carry_from:] for name, column in columns.items()}
+
+    return resampled, carry
+
+def _resample_parameters(rate, method, max_gap, time_unit, output):
+
+    if not isinstance(rate, numbers.Real) or isinstance(rate, bool) or not rate > 0:
+        raise ValueError('rate should be a positive number')
+
+    if method not in _METHODS:
+        raise ValueError(f"method should be one of {', '.join(repr(method) for method in _METHODS)}")
+
+    if max_gap is not None and (not isinstance(max_gap, numbers.Real) or max_gap < 0):
+        raise ValueError('max_gap should be a non-negative number')
+
+    if not isinstance(time_unit, numbers.Real) or not time_unit > 0:
+        raise ValueError('time_unit should be a positive number')
+
+    if output not in [None, 'pandas', 'numpy']:
+        raise ValueError("output should be 'pandas' or 'numpy'")
+
+def _data_arrays(data):
+
+    data_validation(data)
+
+    if 'time' not in data_columns(data):
+        raise ValueError('data should contain a time column')
+
+    columns = {name: data_column(data, name) for name in data_columns(data)}
+    if not np.issubdtype(columns['time'].dtype, np.number):
+        raise ValueError('time should be numeric')
+
+    return columns
+
+def _format_output(columns, data, output):
+
+    if output is None:
+        output = 'pandas' if isinstance(data, pd.DataFrame) else 'numpy'
+
+    return pd.DataFrame(columns) if output == 'pandas' else columns
+
+def resample_data(data, rate, method='mean', max_gap=None, time_unit=1.0, output=None):
+    '''
+    Resample data to a common sampling rate, using the time column.
+
+    Output samples lie on a grid of multiples of 1 / rate seconds, so recordings resampled to
+    the same rate are aligned. Data with an 'epoch_index' column is resampled epoch by epoch.
+
+    Methods:
+    - 'mean': average of the samples within each period of the grid, labelled with the start
+      of the period. Best to downsample. Periods without samples are left out, and missing
+      values are ignored, so a period only becomes missing when all its samples are.
+    - 'decimate': first sample within each period of the grid, unchanged. No averaging is done,
+      so the values are real samples but may alias fast movements.
+    - 'linear': linear interpolation between the samples around each grid point. Use it to
+      upsample or to align recordings. Grid points next to a missing value, or within a gap
+      of more than `max_gap` between samples, are missing.
+    Only floating-point columns are averaged or interpolated. Integer, boolean and other columns,
+    e.g. 'epoch_index', trial numbers or event flags, keep their type and take the value of the
+    first sample of the period ('mean', 'decimate') or of the sample before the grid point
+    ('linear'), since their mean is usually not a valid value. Cast such a column to float
+    beforehand to average or interpolate it.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Data with a time column, sorted by time within each epoch
+    rate : int/float
+        Output sampling rate in Hz
+    method : str, optional
+        'mean', 'decimate' or 'linear'
+    max_gap : int/float, optional
+        Longest interval between samples to interpolate over, in the unit of the time column.
+        By default, 1.5 times the median interval between samples.
+    time_unit : float, optional
+        Duration of one unit of the time column in seconds, e.g. 0.001 for milliseconds.
+    output : 'pandas' or 'numpy', optional
+        Format of the resampled data. By default, a pandas dataframe for pandas input and
+        a dictionary of numpy arrays for any other input.
+
+    Returns:
+    --------
+    resampled : pd.DataFrame or dict of np.array
+        Resampled data, with the same columns as the input
+    '''
+
+    _resample_parameters(rate, method, max_gap, time_unit, output)
+    columns = _data_arrays(data)
+
+    segment_codes, _ = _segments(columns)
+    _check_times(columns['time'].astype(np.float64), segment_codes)
+
+    scale = rate * time_unit
+    if method == 'linear':
+        if max_gap is None:
+            max_gap = _typical_gap(columns['time'].astype(np.float64), segment_codes)
+        resampled, _ = _interpolate_columns(columns, scale, max_gap, carried=False, final=True)
+    else:
+        resampled, _ = _bin_columns(columns, scale, method, final=True)
+
+    return _format_output(resampled, data, output)
+
+def resample_chunks(chunks, rate, method='mean', max_gap=None, time_unit=1.0, output=None):
+    """
+    Resample a stream of data chunks, e.g. read one block of a long recording at a time.
+
+    The chunks together give the same samples as `resample_data` on the whole data: the
+    samples needed to finish a period or an interpolation are held back until the next chunk
+    arrives. With the default `max_gap`, the gap is estimated from the first chunk with at
+    least two samples, and kept for the following chunks.
+
+    Example:
+    --------
+    >>> for chunk in resample_chunks(read_blocks(path), rate=250):
+    ...     hits += aoi_hits(chunk, aoi_definitions, screen_dimensions).sum(axis=0)
+
+    Parameters:
+    -----------
+    chunks : iterable
+        Consecutive chunks of data, with the same columns, see `resample_data`.
+    rate, method, max_gap, time_unit, output :
+        See `resample_data`.
+
+    Yields:
+    -------
+    resampled : pd.DataFrame or dict of np.array
+        Resampled data of each chunk; possibly empty.
+    """
+
+    _resample_parameters(rate, method, max_gap, time_unit, output)
+    scale = rate * time_unit
+    carry = None
+    chunk = None
+
+    for chunk in chunks:
+        columns = _data_arrays(chunk)
+
+        if carry is not None:
+            if list(columns) != list(carry):
+                raise ValueError('All chunks should have the same columns')
+            columns = {name: np.concatenate([carry[name], column]) for name, column in columns.items()}
+
+        segment_codes, _ = _segments(columns)
+        _check_times(columns['time'].astype(np.float64), segment_codes)
+
+        if method == 'linear':
+            if max_gap is None and len(columns['time']) > 1:
+                max_gap = _typical_gap(columns['time'].astype(np.float64), segment_codes)
+            carried = carry is not None and len(carry['time']) > 0
+            resampled, carry = _interpolate_columns(columns, scale, np.inf if max_gap is None else max_gap,
+                                                    carried=carried, final=False)
+        else:
+            resampled, carry = _bin_columns(columns, scale, method, final=False)
+
+        yield _format_output(resampled, chunk, output)
+
+    # the held back samples of the last period
+    if method != 'linear' and carry is not None and len(carry['time']):
+        resampled, _ = _bin_columns(carry, scale, method, final=True)
+        yield _format_output(resampled, chunk, output)
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+from ._utility import data_columns, data_column, data_length
+from .spatial import AOIGridIndex, label_aoi
+
+def _row_timing(df, epoch_codes):
+    '''Start time and duration of every row, as fixations or as samples.'''
+
+    columns = data_columns(df)
+
+    # fixation data from eyelinkio carries its own start and end times
+    if 'stime' in columns and 'etime' in columns:
+        start_times = np.asarray(data_column(df, 'stime'), dtype=float)
+        return start_times, np.asarray(data_column(df, 'etime'), dtype=float) - start_times
+
+    if 'time' not in columns:
+        raise ValueError('data should contain a time column, or stime and etime columns')
+
+    # a sample lasts until the next sample of its epoch; the last sample of each epoch
+    # lasts the median sampling interval of the recording
+    start_times = np.asarray(data_column(df, 'time'), dtype=float)
+    intervals = np.diff(start_times)
+    same_epoch = epoch_codes[1:] == epoch_codes[:-1]
+    typical_interval = np.median(intervals[same_epoch]) if same_epoch.any() else 0.0
+    durations = np.append(np.where(same_epoch, intervals, typical_interval), typical_interval)
+
+    return start_times, durations
+
+def aoi_visits(df, aoi_index):
+    """
+    Run-length encode the AOI labels of the data into visits.
+
+    A visit is a run of consecutive rows (samples or fixations) within one epoch that fall in
+    the same AOI. Rows in no AOI end the current visit.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Samples with a 'time' column, or fixations with 'stime' and 'etime' columns, and the
+        x and y coordinates. If an 'epoch_index' column is present, visits never span epochs.
+    aoi_index : AOIGridIndex
+        Spatial index built over the AOI layout.
+
+    Returns:
+    --------
+    visits : pd.DataFrame
+        One row per visit, in time order within each epoch, with columns 'epoch_index',
+        'aoi', 'start_time', 'duration' and 'n_rows'.
+    """
+
+    labels = label_aoi(df, aoi_index)
+
+    if 'epoch_index' in data_columns(df):
+        epoch_codes = data_column(df, 'epoch_index')
+    else:
+        epoch_codes = np.zeros(data_length(df), dtype=int)
+
+    start_times, durations = _row_timing(df, epoch_codes)
+
+    # keep epochs contiguous, rows stay in their original order within each epoch
+    order = np.argsort(epoch_codes, kind='stable')
+    labels, epoch_codes = labels[order], epoch_codes[order]
+    start_times, durations = start_times[order], durations[order]
+
+    # a new run starts wherever the label or the epoch changes
+    changes = (labels[1:] != labels[:-1]) | (epoch_codes[1:] != epoch_codes[:-1])
+    run_starts = np.flatnonzero(np.concatenate([[len(labels) > 0], changes]))
+    run_lengths = np.diff(np.append(run_starts, len(labels)))
+    run_durations = np.add.reduceat(durations, run_starts) if len(run_starts) else np.zeros(0)
+
+    # runs outside of every AOI are gaps between visits
+    in_aoi = labels[run_starts] >= 0
+    run_starts = run_starts[in_aoi]
+
+    return pd.DataFrame({'epoch_index': epoch_codes[run_starts],
+                         'aoi': labels[run_starts],
+                         'start_time': start_times[run_starts],
+                         'duration': run_durations[in_aoi],
+                         'n_rows': run_lengths[in_aoi]})
+
+def scanpath_metrics(df, aoi_index, epochs=None):
+    """
+    Compute dwell, revisit, first-visit latency and transition statistics per epoch and AOI.
+
+    All statistics are grouped reductions over the run-length encoded visits returned by
+    `aoi_visits`, so the cost is linear in the number of rows whatever the number of epochs.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Samples or fixations, see `aoi_visits`.
+    aoi_index : AOIGridIndex
+        Spatial index built over the AOI layout.
+    epochs : list of tuple, optional
+        Start and end of each epoch, as returned by `epoch_data`. Latencies are measured from
+        the start of the epoch window; by default, from the first row of the epoch.
+
+    Returns:
+    --------
+    metrics : pd.DataFrame
+        One row per (epoch_index, aoi) pair, with columns:
+        - 'n_visits': number of visits.
+        - 'revisits': number of visits after the first one.
+        - 'dwell_time': total duration of the visits.
+        - 'mean_dwell_time': mean duration of a visit.
+        - 'first_visit_latency': time from the start of the epoch to the first visit.
+        AOIs that were never visited have zero visits and missing durations and latencies.
+    transitions : np.array
+        Counts of transitions between consecutive visits, of shape (number of epochs, number
+        of AOIs, number of AOIs), indexed by [epoch, from AOI, to AOI]. Leaving an AOI and
+        coming back to it is counted on the diagonal.
+    """
+
+    if not isinstance(aoi_index, AOIGridIndex):
+        raise ValueError('aoi_index should be an AOIGridIndex')
+
+    visits = aoi_visits(df, aoi_index)
+    n_aois = len(aoi_index.aoi_definitions)
+
+    # epochs, and the time each of them starts
+    columns = data_columns(df)
+    if 'epoch_index' in columns:
+        epoch_ids = np.unique(data_column(df, 'epoch_index'))
+    else:
+        epoch_ids = np.array([0])
+
+    if epochs is not None:
+        if len(epochs) <= epoch_ids.max():
+            raise ValueError('epochs should have one entry per epoch')
+        epoch_starts = np.array([epochs[epoch][0] for epoch in epoch_ids], dtype=float)
+    else:
+        row_starts = data_column(df, 'stime' if 'stime' in columns and 'etime' in columns else 'time')
+        row_starts = np.asarray(row_starts, dtype=float)
+        if 'epoch_index' in columns:
+            epoch_starts = np.full(len(epoch_ids), np.inf)
+            np.minimum.at(epoch_starts, np.searchsorted(epoch_ids, data_column(df, 'epoch_index')), row_starts)
+        else:
+            epoch_starts = np.array([row_starts.min()], dtype=float)
+
+    n_epochs = len(epoch_ids)
+    epoch_codes = np.searchsorted(epoch_ids, visits['epoch_index'].values)
+    aoi_codes = visits['aoi'].values
+
+    # grouped reductions over (epoch, AOI) pairs
+    pair_codes = epoch_codes * n_aois + aoi_codes
+    n_visits = np.bincount(pair_codes, minlength=n_epochs * n_aois)
+    dwell_time = np.bincount(pair_codes, weights=visits['duration'].values, minlength=n_epochs * n_aois)
+
+    # visits are in time order, so the first visit of each pair comes first
+    first_visit_latency = np.full(n_epochs * n_aois, np.nan)
+    first_pairs, first_visits = np.unique(pair_codes, return_index=True)
+    first_visit_latency[first_pairs] = (visits['start_time'].values[first_visits] -
+                                        epoch_starts[epoch_codes[first_visits]])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_dwell_time = dwell_time / n_visits
+
+    metrics = pd.DataFrame({'n_visits': n_visits,
+                            'revisits': np.maximum(n_visits - 1, 0),
+                            'dwell_time': np.where(n_visits > 0, dwell_time, np.nan),
+                            'mean_dwell_time': mean_dwell_time,
+                            'first_visit_latency': first_visit_latency},
+                           index=pd.MultiIndex.from_product([epoch_ids, np.arange(n_aois)],
+                                                            names=['epoch_index', 'aoi']))
+
+    # transitions between consecutive visits of the same epoch
+    same_epoch = epoch_codes[1:] == epoch_codes[:-1]
+    transition_codes = ((epoch_codes[1:] * n_aois + aoi_codes[:-1]) * n_aois + aoi_codes[1:])[same_epoch]
+    transitions = np.bincount(transition_codes, minlength=n_epochs * n_aois * n_aois).reshape(n_epochs, n_aois, n_aois)
+
+    return metrics, transitions
@@ -0,0 +1,222 @@
+import numpy as np
+from ._utility import (dataframe_validation, aoi_definitions_validation, screen_dimensions_validation)
+from ._geometry import aoi_bounding_box, aoi_parameters, points_in_shape, pixel_coordinates
+
+class AOIGridIndex:
+    """
+    Uniform grid spatial index over a layout of AOIs.
+
+    The screen is divided into square cells and every AOI is registered in the cells
+    its bounding box overlaps. Data points are bucketed into cells in bulk and only
+    tested against the AOIs registered in their cell, so the cost of a query grows with
+    the number of candidate AOIs per point rather than with the total number of AOIs.
+
+    As with `define_aoi`, data points are floored to pixels before testing, and points
+    outside the screen or with missing coordinates are never inside an AOI.
+
+    Parameters:
+    -----------
+    aoi_definitions : dict or a list of dict
+        AOI definitions, as accepted by `define_aoi`.
+    screen_dimensions : tuple
+        Screen dimensions (height, width).
+    cell_size : int, optional
+        Side of a grid cell in pixels. By default, chosen so that there is roughly one
+        cell per AOI.
+    """
+
+    def __init__(self, aoi_definitions, screen_dimensions, cell_size=None):
+
+        # validate screen_dimensions
+        screen_dimensions_validation(screen_dimensions)
+
+        # validate aoi_definitions
+        aoi_definitions_validation(aoi_definitions, screen_dimensions)
+
+        if isinstance(aoi_definitions, dict):
+            aoi_definitions = [aoi_definitions]
+
+        self.aoi_definitions = list(aoi_definitions)
+        self.screen_dimensions = tuple(screen_dimensions)
+        screen_height, screen_width = screen_dimensions
+        n_aois = len(self.aoi_definitions)
+
+        if cell_size is None:
+            cell_size = max(int(np.sqrt(screen_height * screen_width / n_aois)), 1)
+        elif int(cell_size) <= 0:
+            raise ValueError('cell_size should be a positive integer')
+
+        self.cell_size = int(cell_size)
+        self.n_rows = -(-screen_height // self.cell_size)
+        self.n_cols = -(-screen_width // self.cell_size)
+
+        # register every AOI in the cells overlapped by its bounding box
+        cell_ids = []
+        aoi_ids = []
+        for idx, aoi in enumerate(self.aoi_definitions):
+            x_min, x_max, y_min, y_max = aoi_bounding_box(aoi)
+            col_start, col_stop = self._cell_range(x_min, x_max, self.n_cols)
+            row_start, row_stop = self._cell_range(y_min, y_max, self.n_rows)
+
+            cells = (np.arange(row_start, row_stop)[:, None] * self.n_cols +
+                     np.arange(col_start, col_stop)[None, :]).ravel()
+            cell_ids.append(cells)
+            aoi_ids.append(np.full(len(cells), idx))
+
+        cell_ids = np.concatenate(cell_ids)
+        aoi_ids = np.concatenate(aoi_ids)
+
+        # compressed cell -> AOI table, AOIs ascending within each cell
+        order = np.lexsort((aoi_ids, cell_ids))
+        self._cell_aois = aoi_ids[order]
+        self._cell_counts = np.bincount(cell_ids, minlength=self.n_rows * self.n_cols)
+        self._cell_offsets = np.concatenate([[0], np.cumsum(self._cell_counts)[:-1]])
+
+        # per-shape parameter tables, so candidate pairs can be tested in one pass per shape
+        self._shape_codes = np.empty(n_aois, dtype=int)
+        self._shape_rows = np.empty(n_aois, dtype=int)
+        self._shapes = ['rectangle', 'circle', 'ellipse', 'polygon']
+        params = {shape: [] for shape in self._shapes}
+
+        for idx, aoi in enumerate(self.aoi_definitions):
+            shape = aoi['shape'].lower()
+            self._shape_codes[idx] = self._shapes.index(shape)
+            self._shape_rows[idx] = len(params[shape])
+            params[shape].append(aoi_parameters(aoi))
+
+        self._params = {}
+        for shape, rows in params.items():
+            if not rows:
+                continue
+
+            if shape == 'polygon':
+                # pad with repeats of the last vertex; the zero-length edges never cross a ray
+                n_vertices = max(len(vertices) for vertices in rows)
+                rows = [np.concatenate([vertices, np.repeat(vertices[-1:], n_vertices - len(vertices), axis=0)])
+                        for vertices in rows]
+
+            self._params[shape] = np.stack(rows)
+
+    def _cell_range(self, low, high, n_cells):
+        '''Range of cells overlapped by the interval [low, high], clipped to the grid.'''
+        start = min(max(int(np.floor(low)) // self.cell_size, 0), n_cells)
+        stop = min(max(int(np.floor(high)) // self.cell_size + 1, 0), n_cells)
+        return start, stop
+
+    def hits(self, x_coord, y_coord):
+        '''
+        Find every (data point, AOI) pair where the data point falls inside the AOI.
+
+        Parameters:
+        -----------
+        x_coord, y_coord : numpy.ndarray
+            Coordinates of the data points
+
+        Returns:
+        --------
+        (point_indices, aoi_indices) : tuple of numpy.ndarray
+            Matching pairs, sorted by data point and then by AOI
+        '''
+
+        x_coord, y_coord, valid_mask = pixel_coordinates(x_coord, y_coord, self.screen_dimensions)
+        point_indices = np.flatnonzero(valid_mask)
+        x_valid = x_coord[valid_mask]
+        y_valid = y_coord[valid_mask]
+
+        # bucket the data points into grid cells
+        cells = ((y_valid // self.cell_size).astype(np.intp) * self.n_cols +
+                 (x_valid // self.cell_size).astype(np.intp))
+        n_candidates = self._cell_counts[cells]
+
+        # expand to one (data point, candidate AOI) pair per AOI registered in the cell
+        pair_points = np.repeat(np.arange(len(cells)), n_candidates)
+        pair_starts = np.repeat(np.cumsum(n_candidates) - n_candidates, n_candidates)
+        pair_ranks = np.arange(len(pair_points)) - pair_starts
+        pair_aois = self._cell_aois[self._cell_offsets[cells][pair_points] + pair_ranks]
+
+        # test the candidate pairs, one vectorized pass per AOI shape
+        inside = np.zeros(len(pair_points), dtype=bool)
+        pair_codes = self._shape_codes[pair_aois]
+
+        for code, shape in enumerate(self._shapes):
+            if shape not in self._params:
+                continue
+
+            selected = np.flatnonzero(pair_codes == code)
+            params = self._params[shape][self._shape_rows[pair_aois[selected]]]
+            x = x_valid[pair_points[selected]]
+            y = y_valid[pair_points[selected]]
+
+            inside[selected] = points_in_shape(x, y, shape, params)
+
+        return point_indices[pair_points[inside]], pair_aois[inside]
+
+    def labels(self, x_coord, y_coord):
+        '''
+        Label every data point with the first AOI (in definition order) that contains it.
+
+        Parameters:
+        -----------
+        x_coord, y_coord : numpy.ndarray
+            Coordinates of the data points
+
+        Returns:
+        --------
+        labels : numpy.ndarray of int
+            Index of the AOI for each data point, -1 if the point is in no AOI
+        '''
+
+        point_indices, aoi_indices = self.hits(x_coord, y_coord)
+
+        labels = np.full(len(np.atleast_1d(x_coord)), -1, dtype=int)
+
+        # pairs are sorted by data point and then by AOI, so the first pair of each point wins
+        first_points, first_pairs = np.unique(point_indices, return_index=True)
+        labels[first_points] = aoi_indices[first_pairs]
+
+        return labels
+
+    def counts(self, x_coord, y_coord):
+        '''
+        Count the data points inside each AOI. Overlapping AOIs each count a shared point.
+
+        Parameters:
+        -----------
+        x_coord, y_coord : numpy.ndarray
+            Coordinates of the data points
+
+        Returns:
+        --------
+        counts : numpy.ndarray of int
+            Number of data points in each AOI
+        '''
+
+        _, aoi_indices = self.hits(x_coord, y_coord)
+
+        return np.bincount(aoi_indices, minlength=len(self.aoi_definitions))
+
+
+def label_aoi(df, aoi_index):
+    """
+    Label every row of a dataframe with the AOI its data point falls in.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame, pyarrow.Table, polars.DataFrame or dict of np.array
+        Dataframe containing the x and y coordinates of the data points.
+    aoi_index : AOIGridIndex
+        Spatial index built over the AOI layout.
+
+    Returns:
+    --------
+    labels : numpy.ndarray of int
+        Index of the first AOI containing each data point, -1 if the point is in no AOI.
+    """
+
+    if not isinstance(aoi_index, AOIGridIndex):
+        raise ValueError('aoi_index should be an AOIGridIndex')
+
+    # keep every row so that the labels line up with the dataframe
+    (x_coord, y_coord), _ = dataframe_validation(df, drop_nan=False)
+
+    return aoi_index.labels(x_coord, y_coord)
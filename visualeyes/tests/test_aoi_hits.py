@@ -0,0 +1,48 @@
+"""Test the aoi_hits function."""
+
+import pandas as pd
+import numpy as np
+from visualeyes import aoi_hits, define_aoi
+
+def test_run_correctly():
+    """
+    Smoke test of whether the function runs without errors for valid input
+    """
+    df = pd.DataFrame({'xpos': [1, 5, 8], 'ypos': [1, 5, 8]})
+    aoi_definitions = [{'shape': 'rectangle', 'coordinates': (0, 3, 0, 3)},
+                       {'shape': 'circle', 'coordinates': (5, 5, 2)}]
+    
+    hits = aoi_hits(df, aoi_definitions, (10, 10))
+    
+    assert hits.shape == (3, 2), 'Hit array shape mismatch.'
+    assert hits.tolist() == [[True, False], [False, True], [False, False]], 'AOI hits are incorrect.'
+    
+    return None
+
+def test_matches_mask_lookup():
+    """
+    Check that hit testing agrees with a lookup in the mask from define_aoi for every shape
+    """
+    screen_dimensions = (60, 80)
+    aoi_definitions = [{'shape': 'rectangle', 'coordinates': (5, 20, 5, 15)},
+                       {'shape': 'circle', 'coordinates': (40, 30, 10)},
+                       {'shape': 'ellipse', 'coordinates': (60, 40, 12, 5, 30)},
+                       {'shape': 'polygon', 'coordinates': [(10, 40), (30, 35), (25, 55), (12, 58)]}]
+    
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'xpos': rng.uniform(-5, 85, 2000), 'ypos': rng.uniform(-5, 65, 2000)})
+    df.loc[::50, 'xpos'] = np.nan
+    
+    hits = aoi_hits(df, aoi_definitions, screen_dimensions)
+    
+    for idx, aoi in enumerate(aoi_definitions):
+        mask = define_aoi(screen_dimensions, [aoi])
+        
+        x, y = df['xpos'].values, df['ypos'].values
+        inside = (x >= 0) & (x < 80) & (y >= 0) & (y < 60)
+        expected = np.zeros(len(df), dtype=bool)
+        expected[inside] = mask[np.floor(y[inside]).astype(int), np.floor(x[inside]).astype(int)] == 1
+        
+        assert np.array_equal(hits[:, idx], expected), f"Hits for {aoi['shape']} AOI are incorrect."
+    
+    return None
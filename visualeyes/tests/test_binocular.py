@@ -0,0 +1,88 @@
+"""Testing the binocular functions in visualeyes.core.binocular.py"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import binocular_summary, combine_eyes, define_aoi, percent_data_in_aoi, epoch_data
+
+def make_binocular_data(n=2000, seed=5):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'time': np.arange(n) / 1000,
+                       'xpos_left': rng.uniform(-20, 220, n), 'ypos_left': rng.uniform(-20, 120, n),
+                       'xpos_right': rng.uniform(-20, 220, n), 'ypos_right': rng.uniform(-20, 120, n)})
+    df.loc[rng.random(n) < 0.1, 'xpos_left'] = np.nan
+    df.loc[rng.random(n) < 0.2, 'ypos_right'] = np.nan
+    return df
+
+def test_run_correctly():
+    """
+    Check that every eye matches percent_data_in_aoi run on that eye alone
+    """
+    screen_dimensions = (100, 200)
+    aoi_mask = define_aoi(screen_dimensions, [{'shape': 'circle', 'coordinates': (100, 50, 30)}])
+    df = make_binocular_data()
+    
+    summary = binocular_summary(df, screen_dimensions, aoi_mask)
+    
+    for eye in ['left', 'right']:
+        monocular = df.rename(columns={f'xpos_{eye}': 'xpos', f'ypos_{eye}': 'ypos'})
+        expected = percent_data_in_aoi(monocular, aoi_mask, screen_dimensions)
+        assert np.isclose(summary[eye]['percent_in_aoi'], expected), f'Percentage for the {eye} eye is incorrect.'
+    
+    expected = percent_data_in_aoi(combine_eyes(df), aoi_mask, screen_dimensions)
+    assert np.isclose(summary['combined']['percent_in_aoi'], expected), 'Combined percentage is incorrect.'
+    
+    # the default heatmap has one bin per 10 pixels and counts every on-screen data point
+    assert summary['left']['heatmap'].shape == (10, 20), 'Heatmap shape is incorrect.'
+    assert summary['left']['heatmap'].sum() == np.round((100 - summary['left']['data_loss']) / 100 * len(df))
+    
+    return None
+
+def test_epochs_and_combine():
+    """
+    One shot test of the per-epoch statistics and of both ways of combining the eyes
+    """
+    screen_dimensions = (100, 200)
+    aoi_mask = define_aoi(screen_dimensions, [{'shape': 'rectangle', 'coordinates': (0, 100, 0, 100)}])
+    _, epoched = epoch_data(make_binocular_data(), [0, 1], 0.5)
+    
+    summary = binocular_summary(epoched, screen_dimensions, aoi_mask, combine='best')
+    
+    assert summary['left']['epoch_percent_in_aoi'].index.tolist() == [0, 1], 'Epoch indices are incorrect.'
+    
+    # the left eye loses fewer samples, so it is the best eye
+    assert np.allclose(summary['combined']['epoch_percent_in_aoi'], summary['left']['epoch_percent_in_aoi'])
+    
+    # averaging falls back to the tracked eye
+    df = pd.DataFrame({'xpos_left': [10, np.nan, np.nan], 'ypos_left': [20, 20, np.nan],
+                       'xpos_right': [20, 30, np.nan], 'ypos_right': [40, 40, np.nan]})
+    combined = combine_eyes(df)
+    assert combined['xpos'].tolist()[:2] == [15, 30] and combined['ypos'].tolist()[:2] == [30, 40]
+    assert np.isnan(combined['xpos'].iloc[2]), 'Combined position should be missing.'
+    
+    with pytest.raises(ValueError, match='Missing binocular x and y coordinates'):
+        combine_eyes(pd.DataFrame({'xpos': [1], 'ypos': [1]}))
+
+def test_missing_epoch():
+    """
+    Check that data points with a missing epoch index count in no epoch
+    """
+    screen_dimensions = (10, 20)
+    aoi_mask = define_aoi(screen_dimensions, [{'shape': 'rectangle', 'coordinates': (0, 10, 0, 10)}])
+    df = pd.DataFrame({'epoch_index': [0, 0, np.nan, 1, 1],
+                       'xpos_left': [5, 15, 5, 5, 15], 'ypos_left': [5, 5, 5, 5, 5],
+                       'xpos_right': [5, 5, 5, 15, 15], 'ypos_right': [5, 5, 5, 5, 5]})
+    
+    summary = binocular_summary(df, screen_dimensions, aoi_mask)
+    
+    assert summary['left']['epoch_percent_in_aoi'].tolist() == [50, 50], 'Left eye epochs are incorrect.'
+    assert summary['right']['epoch_percent_in_aoi'].tolist() == [100, 0], 'Right eye epochs are incorrect.'
+    assert summary['combined']['epoch_percent_in_aoi'].tolist() == [50, 0], 'Combined epochs are incorrect.'
+    
+    # the data point is still part of the totals
+    assert summary['left']['percent_in_aoi'] == 60, 'Left eye percentage is incorrect.'
+    
+    with pytest.raises(ValueError, match='bins should be positive'):
+        binocular_summary(df, screen_dimensions, bins=0)
+    
+    return None
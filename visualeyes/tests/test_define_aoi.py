@@ -78,4 +78,47 @@ def test_define_aoi_invalid_input():
     
     # Test with invalid rectangle coordinates
     with pytest.raises(ValueError, match='Rectangle coordinates should have four elements'):
-        define_aoi((10, 10), [{'shape': 'rectangle', 'coordinates': (2, 5)}])
\ No newline at end of file
+        define_aoi((10, 10), [{'shape': 'rectangle', 'coordinates': (2, 5)}])
+
+def test_define_aoi_ellipse():
+    """
+    One shot test of whether the function correctly defines a rotated elliptical AOI
+    """
+    screen_dimensions = (20, 20)
+    aoi_definitions = [{'shape': 'ellipse', 'coordinates': (10, 10, 6, 2, 90)}]
+    
+    mask = define_aoi(screen_dimensions, aoi_definitions)
+    
+    # Rotated by 90 degrees, the long axis is vertical
+    assert mask[10, 10] == 1, 'Ellipse center is not included.'
+    assert mask[15, 10] == 1 and mask[5, 10] == 1, 'Long axis of the ellipse is incorrect.'
+    assert mask[10, 15] == 0 and mask[10, 5] == 0, 'Short axis of the ellipse is incorrect.'
+
+def test_define_aoi_polygon():
+    """
+    One shot test of whether the function correctly defines a polygonal AOI
+    """
+    screen_dimensions = (10, 10)
+    aoi_definitions = [{'shape': 'polygon', 'coordinates': [(0, 0), (8, 0), (0, 8)]}]
+    
+    mask = define_aoi(screen_dimensions, aoi_definitions)
+    
+    # Check that points below the hypotenuse are included
+    assert mask[1, 1] == 1 and mask[6, 1] == 1, 'Polygon interior is not included.'
+    
+    # Check that points beyond the hypotenuse are excluded
+    assert mask[7, 7] == 0 and mask[9, 9] == 0, 'Outside AOI values are incorrect.'
+
+def test_define_aoi_circle_matches_full_screen():
+    """
+    Check that rasterizing the bounding box only gives the same circle as the full screen
+    """
+    screen_dimensions = (30, 40)
+    x_center, y_center, radius = 20, 12, 7
+    
+    mask = define_aoi(screen_dimensions, [{'shape': 'circle', 'coordinates': (x_center, y_center, radius)}])
+    
+    y, x = np.ogrid[:30, :40]
+    expected = ((x - x_center)**2 + (y - y_center)**2 <= radius**2).astype(np.uint8)
+    
+    assert np.array_equal(mask, expected), 'Circle AOI is incorrect.'
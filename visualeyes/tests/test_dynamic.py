@@ -0,0 +1,71 @@
+"""Testing the dynamic AOI functions in visualeyes.core.dynamic.py"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import dynamic_aoi_hits, percent_data_in_dynamic_aoi, aoi_hits
+
+def test_run_correctly():
+    """
+    Smoke test of whether a moving circle is matched to the data at the right times
+    """
+    # circle moving from x=10 to x=30 between t=0 and t=100
+    track = {'shape': 'circle', 'keyframes': [{'time': 0, 'coordinates': (10, 20, 3)},
+                                               {'time': 100, 'coordinates': (30, 20, 3)}]}
+    
+    df = pd.DataFrame({'time': [0, 50, 50, 100, 150, -10],
+                       'xpos': [10, 20, 10, 30, 30, 10],
+                       'ypos': [20, 20, 20, 20, 20, 20]})
+    
+    hits = dynamic_aoi_hits(df, track, (40, 40))
+    
+    # the circle has moved away at t=50, and is not active outside [0, 100]
+    assert hits[:, 0].tolist() == [True, True, False, True, False, False], 'Dynamic AOI hits are incorrect.'
+    assert np.isclose(percent_data_in_dynamic_aoi(df, track, (40, 40)), 50.0), 'Percentage is incorrect.'
+    
+    return None
+
+def test_step_interpolation_matches_static():
+    """
+    Check that a step track matches the static AOI of the active keyframe, for every shape
+    """
+    screen_dimensions = (60, 80)
+    keyframes = {'rectangle': [(5, 20, 5, 15), (40, 70, 30, 50)],
+                 'ellipse': [(30, 30, 10, 5, 20), (50, 25, 8, 12)],
+                 'polygon': [[(10, 10), (40, 15), (20, 50)], [(50, 10), (75, 30), (55, 55)]]}
+    
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'time': rng.uniform(0, 200, 3000),
+                       'xpos': rng.uniform(0, 80, 3000), 'ypos': rng.uniform(0, 60, 3000)})
+    first = (df['time'] < 100).values
+    
+    for shape, (start, end) in keyframes.items():
+        track = {'shape': shape, 'interpolation': 'step',
+                 'keyframes': [{'time': 0, 'coordinates': start}, {'time': 100, 'coordinates': end},
+                               {'time': 200, 'coordinates': end}]}
+        
+        hits = dynamic_aoi_hits(df, track, screen_dimensions)[:, 0]
+        expected = np.where(first, aoi_hits(df, {'shape': shape, 'coordinates': start}, screen_dimensions)[:, 0],
+                            aoi_hits(df, {'shape': shape, 'coordinates': end}, screen_dimensions)[:, 0])
+        
+        assert np.array_equal(hits, expected), f'Dynamic {shape} AOI hits are incorrect.'
+    
+    return None
+
+def test_invalid_input():
+    """
+    One shot test of whether the functions raise errors for invalid input
+    """
+    df = pd.DataFrame({'time': [0], 'xpos': [1], 'ypos': [1]})
+    
+    with pytest.raises(ValueError, match='data should contain a time column'):
+        dynamic_aoi_hits(df.drop(columns='time'), {'shape': 'circle', 'keyframes': []}, (10, 10))
+    
+    with pytest.raises(ValueError, match='Keyframe times should be strictly increasing'):
+        dynamic_aoi_hits(df, {'shape': 'circle', 'keyframes': [{'time': 5, 'coordinates': (5, 5, 2)},
+                                                               {'time': 5, 'coordinates': (5, 5, 2)}]}, (10, 10))
+    
+    with pytest.raises(ValueError, match='same number of vertices'):
+        dynamic_aoi_hits(df, {'shape': 'polygon',
+                              'keyframes': [{'time': 0, 'coordinates': [(1, 1), (5, 1), (1, 5)]},
+                                            {'time': 1, 'coordinates': [(1, 1), (5, 1), (5, 5), (1, 5)]}]}, (10, 10))
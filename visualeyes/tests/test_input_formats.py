@@ -0,0 +1,146 @@
+"""Testing Arrow, Polars and NumPy column inputs across visualeyes"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import (define_aoi, percent_data_in_aoi, epoch_data, aoi_hits, GazeIntegralImage,
+                        data_quality_metrics, binocular_summary, combine_eyes, AOIGridIndex, scanpath_metrics)
+from visualeyes.core._utility import dataframe_validation
+
+SCREEN = (80, 120)
+AOIS = [{'shape': 'rectangle', 'coordinates': (10, 70, 20, 60)},
+        {'shape': 'circle', 'coordinates': (90, 40, 15)}]
+
+# 16 samples at 4 Hz, in and out of the AOIs, off the screen and missing
+SAMPLES = {'time': np.arange(16) / 4,
+           'xpos': [15, 30, 95, 100, np.nan, 65, -5, 88, 12, 130, 50, 92, 40, 85, 20, 119.5],
+           'ypos': [25, 50, 40, 45, 30, np.nan, 20, 35, 58, 10, 85, 42, 21, 38, 0, 79.5]}
+
+def input_formats(df):
+    formats = {'pandas': df, 'dict': {name: df[name].to_numpy() for name in df.columns}}
+    try:
+        import pyarrow as pa
+        formats['arrow'] = pa.Table.from_pandas(df, preserve_index=False)
+    except ImportError:
+        pass
+    try:
+        import polars as pl
+        formats['polars'] = pl.from_pandas(df)
+    except ImportError:
+        pass
+    return formats
+
+def test_same_results():
+    """
+    Check that every input type gives the same percentages, hits and summed-area tables as pandas
+    """
+    df = pd.DataFrame(SAMPLES)
+    aoi_mask = define_aoi(SCREEN, AOIS)
+    expected_percent = percent_data_in_aoi(df, aoi_mask, SCREEN)
+    expected_hits = aoi_hits(df, AOIS, SCREEN)
+    expected_counts = GazeIntegralImage(df, SCREEN).counts([(0, 120, 0, 80), (10, 70, 20, 60)])
+    
+    for name, data in input_formats(df).items():
+        assert np.allclose(percent_data_in_aoi(data, aoi_mask, SCREEN), expected_percent, equal_nan=True), \
+            f'Percentages are incorrect for {name} input.'
+        assert np.array_equal(aoi_hits(data, AOIS, SCREEN), expected_hits), f'Hits are incorrect for {name} input.'
+        assert np.array_equal(GazeIntegralImage(data, SCREEN).counts([(0, 120, 0, 80), (10, 70, 20, 60)]),
+                              expected_counts), f'Counts are incorrect for {name} input.'
+    
+    return None
+
+def test_epoch_data():
+    """
+    Check that epoching gives the same rows for every input type, as pandas or numpy output
+    """
+    df = pd.DataFrame(SAMPLES)
+    expected_epochs, expected = epoch_data(df, [0, 1, 2.5], 1)
+    
+    for name, data in input_formats(df).items():
+        epochs, epoched = epoch_data(data, [0, 1, 2.5], 1)
+        assert epochs == expected_epochs, f'Epochs are incorrect for {name} input.'
+        
+        if name == 'pandas':
+            assert isinstance(epoched, pd.DataFrame), 'Pandas input should give a dataframe.'
+        else:
+            assert isinstance(epoched, dict), f'{name} input should give numpy arrays.'
+        
+        for column in expected.columns:
+            assert np.allclose(np.asarray(epoched[column]), expected[column].values, equal_nan=True), \
+                f'Column {column} is incorrect for {name} input.'
+        
+        epoched = epoch_data(data, [0, 1, 2.5], 1, output='pandas')[1]
+        assert isinstance(epoched, pd.DataFrame), 'output="pandas" should give a dataframe.'
+        assert np.array_equal(epoched['epoch_index'].values, expected['epoch_index'].values), \
+            f'Epoch indices are incorrect for {name} input.'
+    
+    with pytest.raises(ValueError):
+        epoch_data(df, [1], 2, output='arrow')
+    
+    return None
+
+def test_summaries():
+    """
+    Check that the quality, binocular and scanpath summaries accept every input type,
+    including the numpy output of epoch_data
+    """
+    df = pd.DataFrame(SAMPLES)
+    df['xpos_left'], df['xpos_right'] = df['xpos'] - 1, df['xpos'] + 1
+    df['ypos_left'], df['ypos_right'] = df['ypos'], df['ypos'] + 2
+    epochs, epoched = epoch_data(df, [0, 1, 2.5], 1)
+    aoi_mask = define_aoi(SCREEN, AOIS)
+    aoi_index = AOIGridIndex(AOIS, SCREEN)
+    
+    expected_quality = data_quality_metrics(epoched)
+    expected_binocular = binocular_summary(epoched, SCREEN, aoi_mask)
+    expected_combined = combine_eyes(epoched)['xpos'].values
+    expected_metrics, expected_transitions = scanpath_metrics(epoched, aoi_index, epochs)
+    
+    for name, data in input_formats(epoched).items():
+        pd.testing.assert_frame_equal(data_quality_metrics(data), expected_quality, check_index_type=False)
+        
+        summary = binocular_summary(data, SCREEN, aoi_mask)
+        for eye in ['left', 'right', 'combined']:
+            assert np.isclose(summary[eye]['percent_in_aoi'], expected_binocular[eye]['percent_in_aoi']), \
+                f'Binocular summary is incorrect for {name} input.'
+        assert np.allclose(np.asarray(combine_eyes(data)['xpos']), expected_combined, equal_nan=True), \
+            f'Combined eyes are incorrect for {name} input.'
+        
+        metrics, transitions = scanpath_metrics(data, aoi_index, epochs)
+        pd.testing.assert_frame_equal(metrics, expected_metrics, check_index_type=False)
+        assert np.array_equal(transitions, expected_transitions), f'Transitions are incorrect for {name} input.'
+    
+    # the default numpy output of epoch_data for non-pandas input
+    epochs, epoched = epoch_data(input_formats(df)['dict'], [0, 1, 2.5], 1)
+    pd.testing.assert_frame_equal(data_quality_metrics(epoched), expected_quality, check_index_type=False)
+    
+    return None
+
+def test_zero_copy():
+    """
+    Check that the coordinates of NumPy, Arrow and Polars inputs are read without copies
+    """
+    df = pd.DataFrame(SAMPLES)
+    
+    for name, data in input_formats(df).items():
+        if name == 'pandas':
+            continue
+        (x_coord, y_coord), _ = dataframe_validation(data, drop_nan=False)
+        if name == 'dict':
+            assert np.shares_memory(x_coord, data['xpos']), 'Coordinates of dict input were copied.'
+        else:
+            # a view on the Arrow buffer rather than a new array
+            assert not x_coord.flags.owndata, f'Coordinates of {name} input were copied.'
+    
+    return None
+
+def test_wrong_input():
+    """
+    Check that unsupported inputs raise an error
+    """
+    with pytest.raises(ValueError):
+        percent_data_in_aoi([[1, 2], [3, 4]], define_aoi(SCREEN, AOIS), SCREEN)
+    with pytest.raises(ValueError):
+        percent_data_in_aoi({'xpos': np.zeros(3)}, define_aoi(SCREEN, AOIS), SCREEN)
+    
+    return None
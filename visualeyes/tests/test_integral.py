@@ -0,0 +1,62 @@
+"""Testing the summed-area table in visualeyes.core.integral.py"""
+
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import GazeIntegralImage, define_aoi, percent_data_in_aoi, epoch_data
+
+def test_run_correctly():
+    """
+    Check rectangle counts against hand counts and a brute force count of every rectangle,
+    and percentages against percent_data_in_aoi
+    """
+    screen_dimensions = (4, 6)
+    # 5 points on the screen, one missing and two off the screen
+    df = pd.DataFrame({'time': np.arange(8) / 4,
+                       'xpos': [0, 1.5, 2, 5.9, 3, np.nan, 6, -1], 'ypos': [0, 1, 3.2, 3, 2, 1, 1, 2]})
+    integral = GazeIntegralImage(df, screen_dimensions)
+    
+    counts = integral.counts([(0, 6, 0, 4), (0, 2, 0, 2), (2, 6, 2, 4), (3, 3, 0, 4), (1, 4, 1, 3)])
+    assert counts.tolist() == [5, 2, 3, 0, 2], f'Expected [5, 2, 3, 0, 2], got {counts.tolist()}'
+    
+    rectangles = np.array([(x1, x2, y1, y2)
+                           for x1, x2 in itertools.combinations_with_replacement(range(7), 2)
+                           for y1, y2 in itertools.combinations_with_replacement(range(5), 2)])
+    counts = integral.counts(rectangles)
+    x_coord, y_coord = np.floor(df['xpos'].values), np.floor(df['ypos'].values)
+    for (x1, x2, y1, y2), count in zip(rectangles, counts):
+        expected = np.sum((x_coord >= x1) & (x_coord < x2) & (y_coord >= y1) & (y_coord < y2))
+        assert count == expected, f'Count for {(x1, x2, y1, y2)} is incorrect.'
+    
+    aoi = {'shape': 'rectangle', 'coordinates': (0, 3, 0, 3)}
+    expected = percent_data_in_aoi(df, define_aoi(screen_dimensions, [aoi]), screen_dimensions)
+    assert integral.percent(aoi)[0] == expected == 40.0, f'Expected 40.0, got {integral.percent(aoi)[0]}'
+    
+    return None
+
+def test_per_epoch():
+    """
+    Check that per-epoch tables match tables built on each epoch alone
+    """
+    screen_dimensions = (4, 6)
+    df = pd.DataFrame({'time': np.arange(8) / 4,
+                       'xpos': [0, 1.5, 2, 5.9, 3, np.nan, 4, 1], 'ypos': [0, 1, 3.2, 3, 2, 1, 1, 2]})
+    _, epoched = epoch_data(df, [0, 0.5, 0.75], 1)
+    integral = GazeIntegralImage(epoched, screen_dimensions, per_epoch=True)
+    
+    rectangles = [(0, 6, 0, 4), (1, 4, 1, 3)]
+    percent = integral.percent(rectangles)
+    assert percent.shape == (3, 2), 'Per-epoch shape is incorrect.'
+    assert integral.counts(rectangles).tolist() == [[4, 1], [3, 1], [3, 1]], 'Per-epoch counts are incorrect.'
+    assert np.allclose(percent[:, 0], 100), 'The whole screen should hold every data point.'
+    
+    for idx, epoch in enumerate(integral.epochs):
+        single = GazeIntegralImage(epoched[epoched['epoch_index'] == epoch], screen_dimensions)
+        assert np.array_equal(integral.counts(rectangles)[idx], single.counts(rectangles))
+    
+    with pytest.raises(ValueError, match='Rectangles should be within the screen'):
+        integral.counts([(5, 2, 0, 4)])
+    
+    with pytest.raises(ValueError, match='Only rectangular AOIs can be queried'):
+        integral.counts([{'shape': 'circle', 'coordinates': (3, 2, 1)}])
@@ -0,0 +1,76 @@
+"""Testing the prefetching loader in visualeyes.core.loading.py"""
+
+import threading
+import time
+import pytest
+from visualeyes import prefetch_recordings
+
+def test_run_correctly():
+    """
+    Check that recordings come back in order and that loading overlaps with processing
+    """
+    lock = threading.Lock()
+    events = []
+    started = {path: threading.Event() for path in range(8)}
+    
+    def loader(path):
+        with lock:
+            events.append(('read start', path))
+        started[path].set()
+        return path * 10
+    
+    results = []
+    for path, recording in prefetch_recordings(range(8), loader=loader, prefetch=4):
+        # the next recordings are read while this one is being processed
+        for ahead in range(path + 1, min(path + 5, 8)):
+            assert started[ahead].wait(timeout=10), f'Recording {ahead} was not read ahead.'
+        with lock:
+            events.append(('process end', path))
+        results.append((path, recording))
+    
+    assert results == [(path, path * 10) for path in range(8)], 'Recordings are out of order.'
+    
+    for path in range(7):
+        assert events.index(('read start', path + 1)) < events.index(('process end', path)), \
+            f'Recording {path + 1} was not read while recording {path} was processed.'
+    
+    return None
+
+def test_backpressure():
+    """
+    Check that no more than prefetch recordings are read ahead of the one being processed
+    """
+    lock = threading.Lock()
+    started = []
+    
+    def loader(path):
+        with lock:
+            started.append(path)
+        return path
+    
+    for path, _ in prefetch_recordings(range(20), loader=loader, prefetch=3):
+        time.sleep(0.01)
+        with lock:
+            assert max(started) <= path + 3, 'Too many recordings were read ahead.'
+    
+    return None
+
+def test_errors():
+    """
+    Check that loading errors reach the caller and invalid input is rejected
+    """
+    def loader(path):
+        if path == 2:
+            raise OSError('unreadable file')
+        return path
+    
+    with pytest.raises(OSError, match='unreadable file'):
+        list(prefetch_recordings(range(5), loader=loader))
+    
+    # invalid arguments are rejected at the call, before any iteration
+    with pytest.raises(ValueError, match='prefetch should be a positive integer'):
+        prefetch_recordings(range(5), loader=loader, prefetch=0)
+    with pytest.raises(ValueError, match='paths should not be empty'):
+        prefetch_recordings([], loader=loader)
+    with pytest.raises(ValueError, match='not a single path'):
+        prefetch_recordings('recording.edf', loader=loader)
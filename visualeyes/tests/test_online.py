@@ -0,0 +1,173 @@
+"""Testing the online quality control in visualeyes.core.online.py"""
+
+import socket
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import OnlineQC, socket_samples, define_aoi, percent_data_in_aoi
+
+SCREEN = (80, 120)
+AOIS = [{'shape': 'rectangle', 'coordinates': (10, 70, 20, 60)},
+        {'shape': 'circle', 'coordinates': (90, 40, 15)}]
+
+def simulated_tracker(n=5000, rate=1000, seed=9):
+    """Gaze around the screen center with blinks and off-screen samples, as a live tracker would send."""
+    rng = np.random.default_rng(seed)
+    samples = pd.DataFrame({'time': np.arange(n) / rate,
+                            'xpos': rng.normal(60, 30, n), 'ypos': rng.normal(40, 20, n)})
+    for start in rng.integers(0, n - 100, 10):
+        samples.loc[start:start + rng.integers(20, 100), ['xpos', 'ypos']] = np.nan
+    return samples
+
+def batches(samples, seed=10):
+    rng = np.random.default_rng(seed)
+    start = 0
+    while start < len(samples):
+        stop = start + int(rng.integers(1, 60))
+        yield {name: samples[name].values[start:stop] for name in samples.columns}
+        start = stop
+
+def check_window(qc, window):
+    """Compare the rolling statistics with the batch functions on the samples of the window."""
+    lost = window['xpos'].isna() | window['ypos'].isna()
+    assert qc.n_window == len(window), 'Number of samples is incorrect.'
+    assert np.isclose(qc.track_loss, lost.mean() * 100), 'Track loss is incorrect.'
+    
+    for index, aoi in enumerate(AOIS):
+        expected = percent_data_in_aoi(window, define_aoi(SCREEN, [aoi]), SCREEN)
+        assert np.isclose(qc.percent_in_aoi[index], expected), 'Percentage in AOI is incorrect.'
+    
+    assert np.allclose(qc.mean_position, (window['xpos'].mean(), window['ypos'].mean())), \
+        'Mean position is incorrect.'
+    
+    on_screen = window[(window['xpos'] >= 0) & (window['xpos'] < 120) & (window['ypos'] >= 0) & (window['ypos'] < 80)]
+    expected, _, _ = np.histogram2d(on_screen['ypos'], on_screen['xpos'], bins=[8, 12], range=[[0, 80], [0, 120]])
+    assert np.array_equal(qc.heatmap, expected), 'Heatmap is incorrect.'
+
+def test_run_correctly():
+    """
+    Check the rolling statistics against batch computations while the samples stream in
+    """
+    samples = simulated_tracker()
+    qc = OnlineQC(SCREEN, AOIS, window=700)
+    
+    n_seen = 0
+    for index, batch in enumerate(batches(samples)):
+        qc.update(batch)
+        n_seen += len(batch['xpos'])
+        if index % 25 == 0:
+            check_window(qc, samples.iloc[max(n_seen - 700, 0):n_seen])
+    
+    check_window(qc, samples.iloc[-700:])
+    assert qc.n_samples == len(samples), 'Total number of samples is incorrect.'
+    assert qc.last_time == samples['time'].iloc[-1], 'Last time is incorrect.'
+    
+    # a batch longer than the window replaces all of it
+    qc.update(samples.iloc[:2000])
+    check_window(qc, samples.iloc[1300:2000])
+    
+    return None
+
+def test_latency():
+    """
+    Check that an update costs the same whatever the window length
+    """
+    samples = simulated_tracker(n=20000)
+    
+    median_seconds = {}
+    for window in [1000, 1000000]:
+        qc = OnlineQC(SCREEN, AOIS, window=window)
+        update_seconds = []
+        for start in range(0, len(samples), 100):
+            qc.update(samples.iloc[start:start + 100])
+            update_seconds.append(qc.last_update_seconds)
+        median_seconds[window] = np.median(update_seconds)
+    
+    # an update that scanned the window would be over ten times slower with the long window
+    assert median_seconds[1000000] < 3 * median_seconds[1000], \
+        f'Updates are slower with a long window ({median_seconds[1000000]:.2g} s vs {median_seconds[1000]:.2g} s).'
+    
+    return None
+
+def test_socket():
+    """
+    Check that samples sent over a socket by a simulated tracker are all received
+    """
+    samples = simulated_tracker(n=3000)
+    lines = [f'{t:.3f} {x:.2f} {y:.2f}' if np.isfinite(x) else f'{t:.3f} . .'
+             for t, x, y in samples.itertuples(index=False)]
+    payload = ('\n'.join(lines) + '\n').encode()
+    
+    server = socket.create_server(('127.0.0.1', 0))
+    
+    def send():
+        connection, _ = server.accept()
+        with connection:
+            # send in uneven pieces, splitting lines
+            for start in range(0, len(payload), 997):
+                connection.sendall(payload[start:start + 997])
+    
+    sender = threading.Thread(target=send)
+    sender.start()
+    
+    qc = OnlineQC(SCREEN, AOIS, window=500)
+    received = []
+    for batch in socket_samples(server.getsockname(), timeout=10):
+        received.append(batch)
+        qc.update(batch)
+    
+    sender.join()
+    server.close()
+    
+    time = np.concatenate([batch['time'] for batch in received])
+    xpos = np.concatenate([batch['xpos'] for batch in received])
+    assert np.allclose(time, samples['time'].values), 'Times are incorrect.'
+    assert np.allclose(xpos, samples['xpos'].values, atol=0.01, equal_nan=True), 'Coordinates are incorrect.'
+    assert qc.n_samples == len(samples), 'Number of samples is incorrect.'
+    
+    return None
+
+def test_malformed_lines():
+    """
+    Check that a line without three values is rejected or skipped, never shifting the next samples
+    """
+    payload = b'0.001 10 20\n0.002 30\n0.003 40 50 60\n0.004,70,.\n'
+    
+    server = socket.create_server(('127.0.0.1', 0))
+    
+    def send():
+        for _ in range(2):
+            connection, _ = server.accept()
+            with connection:
+                connection.sendall(payload)
+    
+    sender = threading.Thread(target=send)
+    sender.start()
+    
+    with pytest.raises(ValueError):
+        list(socket_samples(server.getsockname(), timeout=10))
+    
+    batches = list(socket_samples(server.getsockname(), timeout=10, skip_malformed=True))
+    sender.join()
+    server.close()
+    
+    time = np.concatenate([batch['time'] for batch in batches])
+    ypos = np.concatenate([batch['ypos'] for batch in batches])
+    assert np.allclose(time, [0.001, 0.004]), 'Malformed lines should be skipped.'
+    assert ypos[0] == 20 and np.isnan(ypos[1]), 'Coordinates are incorrect.'
+    
+    return None
+
+def test_wrong_input():
+    """
+    Check that wrong inputs raise errors
+    """
+    with pytest.raises(ValueError):
+        OnlineQC(SCREEN, window=0)
+    with pytest.raises(ValueError):
+        OnlineQC(SCREEN, bins='auto')
+    with pytest.raises(ValueError):
+        OnlineQC(SCREEN).update({'time': np.zeros(3)})
+    
+    return None
@@ -2,7 +2,8 @@
 
 import pandas as pd
 import numpy as np
-from visualeyes import percent_data_in_aoi
+import pytest
+from visualeyes import percent_data_in_aoi, define_aoi, compact_data
 
 def test_run_correctly():
     """
@@ -54,4 +55,47 @@ def test_all_data_in_aoi():
     # Check the result
     assert result == 100.0, f'Expected 100.0, got {result}'
     
+    return None
+    
+def test_compact_mode_is_equivalent():
+    """
+    Check that a bool mask and float32 data give the same result as the defaults
+    """
+    screen_dimensions = (1080, 1920)
+    aoi_definitions = [{'shape': 'circle', 'coordinates': (960, 540, 200)},
+                       {'shape': 'rectangle', 'coordinates': (100, 400, 100, 300)}]
+    
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({'time': np.arange(10000) / 1000, 
+                       'xpos': rng.uniform(-50, 1970, 10000), 'ypos': rng.uniform(-50, 1130, 10000)})
+    df.loc[::17, 'ypos'] = np.nan
+    
+    compact_df = compact_data(df)
+    assert compact_df['xpos'].dtype == np.float32 and compact_df['time'].dtype == np.float64, 'Dtypes are incorrect.'
+    
+    result = percent_data_in_aoi(df, define_aoi(screen_dimensions, aoi_definitions), screen_dimensions)
+    compact_result = percent_data_in_aoi(compact_df, define_aoi(screen_dimensions, aoi_definitions, dtype=bool), 
+                                         screen_dimensions)
+    
+    assert result == compact_result, f'Expected {result}, got {compact_result}'
+    
+    return None
+
+    
+def test_compact_other_inputs():
+    """
+    Check that compact_data downcasts a dictionary of numpy arrays, and rejects other inputs
+    """
+    data = {'time': np.array([0.0, 0.001, 0.002]), 'xpos': np.array([1.5, np.nan, 3.25]),
+            'ypos': np.array([1.0, 2.0, 3.0]), 'flag': np.array([0, 1, 0])}
+    
+    compact = compact_data(data)
+    assert isinstance(compact, dict), 'Dictionary input should give a dictionary.'
+    assert compact['xpos'].dtype == np.float32 and compact['ypos'].dtype == np.float32, 'Coordinates should be float32.'
+    assert compact['time'] is data['time'] and compact['flag'] is data['flag'], 'Other columns should not be copied.'
+    assert np.array_equal(compact['xpos'], data['xpos'], equal_nan=True), 'Values are incorrect.'
+    
+    with pytest.raises(ValueError):
+        compact_data([[1, 2], [3, 4]])
+    
     return None
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""Testing the memoized pipeline in visualeyes.core.pipeline.py"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import Pipeline, content_hash, define_aoi, epoch_data, percent_data_in_aoi
+from visualeyes.core import processing
+
+def make_pipeline(**kwargs):
+    pipe = Pipeline(**kwargs)
+    pipe.set_input('samples', pd.DataFrame({'time': np.arange(100) / 10, 'xpos': np.arange(100) % 20,
+                                            'ypos': np.arange(100) % 10}))
+    pipe.set_input('screen', (10, 20))
+    pipe.set_input('aois', [{'shape': 'rectangle', 'coordinates': (0, 10, 0, 10)}])
+    pipe.set_input('window_start', [0, 5])
+    pipe.set_input('window_duration', 2)
+    
+    pipe.add_stage('epochs', epoch_data, 'samples', 'window_start', 'window_duration')
+    pipe.add_stage('epoched', lambda epochs: epochs[1], 'epochs')
+    pipe.add_stage('mask', define_aoi, 'screen', 'aois')
+    pipe.add_stage('percent', percent_data_in_aoi, 'epoched', 'mask', 'screen')
+    return pipe
+
+def test_run_correctly():
+    """
+    Check that changing an input only recomputes the stages that depend on it
+    """
+    pipe = make_pipeline()
+    
+    assert pipe.get('percent') == 50.0, 'Percentage is incorrect.'
+    assert sorted(pipe.last_computed) == ['epoched', 'epochs', 'mask', 'percent']
+    
+    # nothing changed
+    pipe.get('percent')
+    assert pipe.last_computed == [], 'Nothing should be recomputed.'
+    
+    # a new AOI leaves the epochs untouched
+    pipe.set_input('aois', [{'shape': 'rectangle', 'coordinates': (0, 5, 0, 10)}])
+    assert pipe.get('percent') == 25.0, 'Percentage is incorrect.'
+    assert sorted(pipe.last_computed) == ['mask', 'percent']
+    
+    # a new epoch window leaves the mask untouched
+    pipe.set_input('window_duration', 3)
+    pipe.get('percent')
+    assert sorted(pipe.last_computed) == ['epoched', 'epochs', 'percent']
+    
+    # going back to earlier inputs reuses the cached results
+    pipe.set_input('window_duration', 2)
+    pipe.get('percent')
+    assert pipe.last_computed == [], 'Cached results should be reused.'
+    
+    return None
+
+def test_disk_cache_and_eviction(tmp_path):
+    """
+    Check that results survive in the disk cache and that the memory cache is bounded
+    """
+    pipe = make_pipeline(cache_size=2, cache_dir=str(tmp_path))
+    pipe.get('percent')
+    assert len(pipe._cache) == 2, 'Memory cache exceeds its size.'
+    
+    # a new pipeline over the same inputs reads everything from disk
+    pipe = make_pipeline(cache_dir=str(tmp_path))
+    assert pipe.get('percent') == 50.0 and pipe.last_computed == []
+    
+    return None
+
+def test_disk_cache_across_processes(tmp_path):
+    """
+    Check that separate processes share the disk cache, including stages with nested code
+    """
+    script = (
+        "import sys, json\n"
+        "sys.path.insert(0, sys.argv[2])\n"
+        "from test_pipeline import make_pipeline\n"
+        "pipe = make_pipeline(cache_dir=sys.argv[1])\n"
+        "print(json.dumps([pipe.get('percent'), pipe.last_computed]))\n"
+    )
+    
+    results = []
+    for _ in range(2):
+        output = subprocess.run([sys.executable, '-c', script, str(tmp_path), os.path.dirname(__file__)],
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output))
+    
+    assert results[0][0] == results[1][0] == 50.0, 'Percentage is incorrect.'
+    assert sorted(results[0][1]) == ['epoched', 'epochs', 'mask', 'percent']
+    assert results[1][1] == [], 'A new process should read every stage from the disk cache.'
+    
+    return None
+
+def test_closures_and_defaults():
+    """
+    Check that stage keys change with the closures and default arguments of the stage functions
+    """
+    def make(k):
+        return lambda x: x * k
+    
+    def scale(x, k=2):
+        return x * k
+    
+    pipe = Pipeline()
+    pipe.set_input('x', 3)
+    pipe.add_stage('y', make(2), 'x')
+    assert pipe.get('y') == 6
+    
+    pipe.add_stage('y', make(10), 'x')
+    assert pipe.get('y') == 30 and pipe.last_computed == ['y'], 'A new closure should recompute the stage.'
+    
+    pipe.add_stage('z', scale, 'x')
+    assert pipe.get('z') == 6
+    scale.__defaults__ = (5,)
+    pipe.add_stage('z', scale, 'x')
+    assert pipe.get('z') == 15, 'New default arguments should recompute the stage.'
+    
+    lock = threading.Lock()
+    pipe.add_stage('w', lambda x: lock and x, 'x')
+    with pytest.raises(ValueError):
+        pipe.key('w')
+    
+    return None
+
+def test_called_functions(monkeypatch):
+    """
+    Check that stage keys change with the module-level functions the stage functions call
+    """
+    namespace = {}
+    exec('def helper(x):\n    return x + 1\n\n'
+         'def stage(x):\n    return helper(x) * 2\n\n'
+         'def countdown(n):\n    return countdown(n - 1) if n else helper(0)\n', namespace)
+    
+    pipe = Pipeline()
+    pipe.set_input('x', 3)
+    pipe.add_stage('y', namespace['stage'], 'x')
+    pipe.add_stage('z', namespace['countdown'], 'x')
+    assert pipe.get('y') == 8 and pipe.get('z') == 1
+    
+    exec('def helper(x):\n    return x + 2\n', namespace)
+    pipe.add_stage('y', namespace['stage'], 'x')
+    pipe.add_stage('z', namespace['countdown'], 'x')
+    assert pipe.get('y') == 10 and pipe.get('z') == 2, 'A changed helper should recompute the stages.'
+    
+    # a change in a visualeyes helper changes the keys of the functions calling it
+    pipe = make_pipeline()
+    key = pipe.key('percent')
+    monkeypatch.setattr(processing, 'dataframe_validation', lambda *args, **kwargs: None)
+    pipe.add_stage('percent', percent_data_in_aoi, 'epoched', 'mask', 'screen')
+    assert pipe.key('percent') != key, 'A changed visualeyes helper should change the key.'
+    
+    return None
+
+def test_content_hash_and_cycles():
+    """
+    One shot tests of content hashing and of cycle detection
+    """
+    df = pd.DataFrame({'xpos': [1.0, 2.0], 'ypos': [3.0, 4.0]})
+    assert content_hash(df) == content_hash(df.copy()), 'Equal content should hash equally.'
+    assert content_hash(df) != content_hash(df.astype(np.float32)), 'Dtypes should change the hash.'
+    assert content_hash({'a': [1, 2]}) != content_hash({'a': (1, 2)}), 'Types should change the hash.'
+    
+    pipe = Pipeline()
+    pipe.add_stage('a', lambda b: b, 'b')
+    with pytest.raises(ValueError, match='Cycle between stages'):
+        pipe.add_stage('b', lambda a: a, 'a')
@@ -0,0 +1,84 @@
+"""Testing the data-quality metrics in visualeyes.core.quality.py"""
+
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import data_quality_metrics, pixels_per_degree
+
+def test_run_correctly():
+    """
+    One shot test of the metrics on two small epochs with known values
+    """
+    df = pd.DataFrame({'time': np.arange(10) * 2,
+                       'xpos': [1, 2, np.nan, 4, 5, 6, 7, 8, 9, 10],
+                       'ypos': np.zeros(10),
+                       'epoch_index': [0] * 5 + [1] * 5})
+    
+    metrics = data_quality_metrics(df, target=[(0, 0), (5, 0)], time_unit=0.001)
+    
+    assert metrics.index.tolist() == [0, 1], 'Epoch indices are incorrect.'
+    assert metrics['n_samples'].tolist() == [5, 5], 'Sample counts are incorrect.'
+    assert np.allclose(metrics['data_loss'], [20, 0]), 'Data loss is incorrect.'
+    
+    # the gap in the first epoch leaves two valid pairs one pixel apart
+    assert np.allclose(metrics['precision_rms_s2s_px'], [1, 1]), 'RMS-S2S precision is incorrect.'
+    assert np.allclose(metrics['precision_std_px'], [np.std([1, 2, 4, 5]), np.std([6, 7, 8, 9, 10])]), \
+        'STD precision is incorrect.'
+    assert np.allclose(metrics['accuracy_px'], [3, 3]), 'Accuracy is incorrect.'
+    assert np.allclose(metrics['sampling_rate'], [500, 500]), 'Sampling rate is incorrect.'
+    assert np.allclose(metrics['sampling_jitter'], [0, 0]), 'Sampling jitter is incorrect.'
+    
+    return None
+
+def test_matches_groupby():
+    """
+    Check the grouped reductions against a per-group computation, grouping by subject and epoch
+    """
+    rng = np.random.default_rng(3)
+    n = 3000
+    df = pd.DataFrame({'subject': rng.choice(['a', 'b', 'c'], n), 'epoch_index': rng.integers(0, 4, n),
+                       'time': np.cumsum(rng.uniform(1, 3, n)), 'xpos': rng.normal(500, 20, n),
+                       'ypos': rng.normal(300, 20, n)})
+    df.loc[rng.random(n) < 0.1, 'xpos'] = np.nan
+    
+    metrics = data_quality_metrics(df, group_by=['subject', 'epoch_index'], target=(500, 300), ppd=40.0)
+    
+    for (subject, epoch), group in df.groupby(['subject', 'epoch_index']):
+        row = metrics.loc[(subject, epoch)]
+        x, y = group['xpos'].values, group['ypos'].values
+        steps = np.diff(x)**2 + np.diff(y)**2
+        valid = ~np.isnan(x)
+        
+        assert np.isclose(row['precision_rms_s2s_px'], np.sqrt(np.nanmean(steps)))
+        assert np.isclose(row['precision_std_px'], np.sqrt(np.var(x[valid]) + np.var(y[valid])))
+        assert np.isclose(row['accuracy_deg'], np.mean(np.hypot(x[valid] - 500, y[valid] - 300)) / 40)
+        assert np.isclose(row['sampling_jitter'], np.std(np.diff(group['time'])))
+        assert np.isclose(row['sampling_rate'], 1 / np.median(np.diff(group['time'])))
+    
+    return None
+
+def test_empty_data():
+    """
+    Check that empty data gives missing metrics without warnings
+    """
+    df = pd.DataFrame({'time': np.zeros(0), 'xpos': np.zeros(0), 'ypos': np.zeros(0)})
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        metrics = data_quality_metrics(df)
+    
+    assert metrics['n_samples'].tolist() == [0], 'Number of samples is incorrect.'
+    assert metrics.drop(columns='n_samples').isna().all(axis=None), 'Metrics of empty data should be missing.'
+    
+    return None
+
+def test_pixels_per_degree():
+    """
+    One shot test of the conversion to degrees of visual angle
+    """
+    # a 1920 pixel wide, 53 cm screen viewed from 57 cm is roughly 36 pixels per degree
+    assert np.isclose(pixels_per_degree((1080, 1920), 53.0, 57.0), 36.0, atol=0.1)
+    
+    with pytest.raises(ValueError, match='viewing_distance_cm should be a positive number'):
+        pixels_per_degree((1080, 1920), 53.0, 0)
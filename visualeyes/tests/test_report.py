@@ -0,0 +1,80 @@
+"""Testing the cohort report in visualeyes.core.report.py"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import build_report, define_aoi, percent_data_in_aoi
+
+SCREEN = (80, 120)
+AOIS = [{'shape': 'rectangle', 'coordinates': (10, 70, 20, 60)},
+        {'shape': 'circle', 'coordinates': (90, 40, 15)}]
+
+# a few samples at 500 Hz for each subject, in and out of the AOIs, off the screen and missing
+POSITIONS = {'s1': {'xpos': [15, 30, 95, 100, np.nan, 65], 'ypos': [25, 50, 40, 45, 30, 10]},
+             's2': {'xpos': [20, 88, 92, -5, 50, 119], 'ypos': [30, 35, 42, 20, 85, 79]},
+             's3': {'xpos': [60, 61, 62, 90, 91, np.nan], 'ypos': [40, 40, 41, 38, 39, np.nan]},
+             's4': {'xpos': [5, 10, 115, 118, 70, 71], 'ypos': [5, 75, 5, 75, 40, 41]}}
+
+def test_run_correctly(tmp_path):
+    """
+    Check the summary, the report files and the AOI percentages
+    """
+    subjects = {name: pd.DataFrame({'time': np.arange(6) / 500, **POSITIONS[name]}) for name in ['s1', 's2']}
+    summary, rendered = build_report(subjects, tmp_path, SCREEN, AOIS, n_workers=2)
+    
+    assert rendered == ['s1', 's2'], 'All subjects should be rendered on the first build.'
+    assert list(summary.index) == ['s1', 's2'], 'Subjects are incorrect.'
+    assert summary.loc['s1', 'n_samples'] == 6, 'Number of samples is incorrect.'
+    
+    for index, aoi in enumerate(AOIS):
+        expected = percent_data_in_aoi(subjects['s2'], define_aoi(SCREEN, [aoi]), SCREEN)
+        assert np.isclose(summary.loc['s2', f'percent_aoi_{index}'], expected), 'AOI percentage is incorrect.'
+    
+    report = (tmp_path / 'index.html').read_text()
+    assert 's1' in report and 's2' in report, 'Subjects are missing from the report.'
+    assert len(os.listdir(tmp_path / 'thumbnails')) == 4, 'Each subject should have two thumbnails.'
+    
+    return None
+
+def test_incremental(tmp_path):
+    """
+    Check that only new and changed subjects are rendered again
+    """
+    subjects = {name: pd.DataFrame({'time': np.arange(6) / 500, **POSITIONS[name]}) for name in ['s1', 's2', 's3']}
+    summary, _ = build_report(subjects, tmp_path, SCREEN, AOIS, n_workers=2)
+    
+    # same content, new objects
+    _, rendered = build_report({name: data.copy() for name, data in subjects.items()}, tmp_path, SCREEN, AOIS)
+    assert rendered == [], 'Unchanged subjects should not be rendered.'
+    
+    subjects['s2'] = subjects['s2'].assign(xpos=subjects['s2']['xpos'] + 1)
+    subjects['s4'] = pd.DataFrame({'time': np.arange(6) / 500, **POSITIONS['s4']})
+    del subjects['s1']
+    new_summary, rendered = build_report(subjects, tmp_path, SCREEN, AOIS, n_workers=2)
+    
+    assert sorted(rendered) == ['s2', 's4'], 'Only changed and new subjects should be rendered.'
+    assert list(new_summary.index) == ['s2', 's3', 's4'], 'Removed subjects should leave the report.'
+    pd.testing.assert_series_equal(new_summary.loc['s3'], summary.loc['s3'])
+    assert len(os.listdir(tmp_path / 'thumbnails')) == 6, 'Stale thumbnails should be removed.'
+    
+    # changing a setting renders everything again
+    _, rendered = build_report(subjects, tmp_path, SCREEN, AOIS[:1], n_workers=2)
+    assert sorted(rendered) == ['s2', 's3', 's4'], 'All subjects should be rendered after a change of settings.'
+    
+    return None
+
+def test_wrong_input(tmp_path):
+    """
+    Check that wrong inputs raise errors
+    """
+    df = pd.DataFrame({'time': np.arange(6) / 500, **POSITIONS['s1']})
+    
+    with pytest.raises(ValueError):
+        build_report([df], tmp_path, SCREEN)
+    with pytest.raises(ValueError):
+        build_report({'s1': df}, tmp_path, SCREEN, n_workers=0)
+    with pytest.raises(ValueError):
+        build_report({'s1': [1, 2, 3]}, tmp_path, SCREEN)
+    
+    return None
@@ -0,0 +1,142 @@
+"""Testing the resampling functions in visualeyes.core.resampling.py"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import resample_data, resample_chunks, epoch_data
+
+# 2 s at 1000 Hz: x is a ramp with the 20 samples from 0.5 s missing, y a sine, and an integer flag
+TIME = np.arange(2000) / 1000
+DATA = pd.DataFrame({'time': TIME, 'xpos': np.where((TIME >= 0.5) & (TIME < 0.52), np.nan, 100 + 50 * TIME),
+                     'ypos': 40 + 30 * np.sin(3 * TIME), 'flag': np.arange(2000) % 4})
+
+def test_mean():
+    """
+    Check that mean-binning averages each period of the grid and keeps missing periods missing
+    """
+    resampled = resample_data(DATA, 250)
+    grid = np.arange(500) / 250
+    
+    assert len(resampled) == 500, 'Number of samples is incorrect.'
+    assert np.allclose(resampled['time'].values, grid), 'Grid is incorrect.'
+    assert np.allclose(resampled['ypos'].values, DATA['ypos'].values.reshape(-1, 4).mean(axis=1)), \
+        'Means are incorrect.'
+    
+    # the mean of a ramp over a period is its value at the middle of the 4 samples, 1.5 ms after
+    # the start; the missing samples 500 to 519 cover periods 125 to 129 completely
+    missing = (grid >= 0.5) & (grid < 0.52)
+    assert resampled['xpos'].isna().values.tolist() == missing.tolist(), 'Missing periods are incorrect.'
+    assert np.allclose(resampled['xpos'].values[~missing], 100 + 50 * (grid[~missing] + 0.0015)), \
+        'Means are incorrect.'
+    
+    # integer columns keep the first sample of each period, unless cast to float
+    assert resampled['flag'].dtype == DATA['flag'].dtype, 'Integer columns should keep their type.'
+    assert np.all(resampled['flag'].values == 0), 'Integer columns should keep the first sample.'
+    resampled = resample_data(DATA.astype({'flag': float}), 250)
+    assert np.all(resampled['flag'].values == 1.5), 'Float columns should be averaged.'
+    
+    return None
+
+def test_decimate():
+    """
+    Check that decimation keeps the first sample of each period unchanged
+    """
+    resampled = resample_data(DATA, 500, method='decimate')
+    expected = DATA.iloc[::2].reset_index(drop=True)
+    
+    pd.testing.assert_frame_equal(resampled, expected)
+    
+    return None
+
+def test_linear():
+    """
+    Check linear interpolation, and that it does not bridge missing values or gaps
+    """
+    df = DATA.iloc[::4]
+    resampled = resample_data(df, 1000, method='linear')
+    time = resampled['time'].values
+    
+    assert np.allclose(time, np.arange(1997) / 1000), 'Grid should span the samples.'
+    assert np.allclose(resampled['ypos'].values, np.interp(time, df['time'].values, df['ypos'].values)), \
+        'Interpolation is incorrect.'
+    
+    # the 5 missing samples from 0.5 s and the 3 grid points on each side of each make 23
+    # missing grid points, from 0.497 s to 0.519 s; the ramp is interpolated exactly elsewhere
+    missing = (time > 0.4965) & (time < 0.5195)
+    assert resampled['xpos'].isna().values.tolist() == missing.tolist(), 'Missing values should not be bridged.'
+    assert np.allclose(resampled['xpos'].values[~missing], 100 + 50 * time[~missing]), 'Interpolation is incorrect.'
+    
+    # remove 100 ms of samples: no grid point within the gap is interpolated
+    gap = df[(df['time'] < 1.2) | (df['time'] >= 1.3)]
+    resampled = resample_data(gap, 1000, method='linear')
+    time = resampled['time'].values
+    in_gap = (time > 1.1965) & (time < 1.2995)
+    assert resampled['ypos'].isna().values.tolist() == in_gap.tolist(), 'Gaps should not be interpolated.'
+    expected = np.interp(time[~in_gap], gap['time'].values, gap['ypos'].values)
+    assert np.allclose(resampled['ypos'].values[~in_gap], expected), 'Samples around the gap should be kept.'
+    
+    return None
+
+def test_epochs():
+    """
+    Check that epochs are resampled separately, even when they overlap
+    """
+    epochs, epoched = epoch_data(DATA, [0.25, 0.375, 1.0], 0.25)
+    
+    for method in ['mean', 'decimate', 'linear']:
+        resampled = resample_data(epoched, 200, method=method)
+        assert resampled.groupby('epoch_index').size().tolist() == [50, 50, 50], \
+            f'Epochs are incorrect for {method}.'
+        assert resampled['time'].iloc[50] == pytest.approx(0.375), f'Second epoch is incorrect for {method}.'
+    
+    return None
+
+@pytest.mark.parametrize('method', ['mean', 'decimate', 'linear'])
+def test_chunks(method):
+    """
+    Check that resampling chunks gives the same result as resampling the whole data
+    """
+    epochs, epoched = epoch_data(DATA, [0.1, 0.15, 1.0], 0.5)
+    
+    for data in [DATA, epoched]:
+        expected = resample_data(data, 300, method=method)
+        chunks = (data.iloc[start:start + 333] for start in range(0, len(data), 333))
+        resampled = pd.concat(list(resample_chunks(chunks, 300, method=method)), ignore_index=True)
+        
+        assert resampled.shape == expected.shape, 'Number of samples is incorrect.'
+        assert np.allclose(resampled.values, expected.values, equal_nan=True), 'Samples are incorrect.'
+    
+    return None
+
+def test_numpy_input():
+    """
+    Check that a dictionary of numpy arrays gives the same result as a dataframe
+    """
+    df = DATA
+    expected = resample_data(df, 250, method='linear')
+    resampled = resample_data({name: df[name].values for name in df.columns}, 250, method='linear')
+    
+    assert isinstance(resampled, dict), 'Numpy input should give numpy output.'
+    for name in df.columns:
+        assert np.allclose(resampled[name], expected[name].values, equal_nan=True), f'{name} is incorrect.'
+    
+    return None
+
+def test_wrong_input():
+    """
+    Check that wrong inputs raise errors
+    """
+    df = DATA
+    
+    with pytest.raises(ValueError):
+        resample_data(df, 0)
+    with pytest.raises(ValueError):
+        resample_data(df, 250, method='cubic')
+    with pytest.raises(ValueError):
+        resample_data(df.drop(columns='time'), 250)
+    with pytest.raises(ValueError):
+        resample_data(df.iloc[::-1], 250)
+    with pytest.raises(ValueError):
+        resample_data(df, 250, max_gap=-1)
+    
+    return None
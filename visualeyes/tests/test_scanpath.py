@@ -0,0 +1,54 @@
+"""Testing the scanpath functions in visualeyes.core.scanpath.py"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import AOIGridIndex, aoi_visits, scanpath_metrics, epoch_data
+
+AOI_DEFINITIONS = [{'shape': 'rectangle', 'coordinates': (0, 10, 0, 10)},
+                   {'shape': 'rectangle', 'coordinates': (20, 30, 0, 10)}]
+
+def test_run_correctly():
+    """
+    One shot test of visits, dwell times, latencies and transitions on a known scanpath
+    """
+    # AOI 0, AOI 0, outside, AOI 1, AOI 0, AOI 0 | AOI 1, AOI 1, outside, outside
+    x = [5, 5, 15, 25, 5, 5, 25, 25, 15, 15]
+    df = pd.DataFrame({'time': np.arange(10, dtype=float), 'xpos': x, 'ypos': [5] * 10,
+                       'epoch_index': [0] * 6 + [1] * 4})
+    aoi_index = AOIGridIndex(AOI_DEFINITIONS, (10, 40))
+    
+    visits = aoi_visits(df, aoi_index)
+    assert visits['aoi'].tolist() == [0, 1, 0, 1], 'Visits are incorrect.'
+    assert visits['duration'].tolist() == [2, 1, 2, 2], 'Visit durations are incorrect.'
+    
+    metrics, transitions = scanpath_metrics(df, aoi_index)
+    
+    assert metrics['n_visits'].tolist() == [2, 1, 0, 1], 'Visit counts are incorrect.'
+    assert metrics['revisits'].tolist() == [1, 0, 0, 0], 'Revisit counts are incorrect.'
+    assert metrics.loc[(0, 0), 'dwell_time'] == 4 and metrics.loc[(0, 0), 'mean_dwell_time'] == 2
+    assert metrics.loc[(0, 1), 'first_visit_latency'] == 3, 'Latency is incorrect.'
+    assert metrics.loc[(1, 1), 'first_visit_latency'] == 0, 'Latency is incorrect.'
+    assert np.isnan(metrics.loc[(1, 0), 'first_visit_latency']), 'Unvisited AOI should have no latency.'
+    
+    assert transitions.tolist() == [[[0, 1], [1, 0]], [[0, 0], [0, 0]]], 'Transitions are incorrect.'
+    
+    return None
+
+def test_fixations_and_epoch_windows():
+    """
+    Check that fixation durations and epoch window starts are used when available
+    """
+    df = pd.DataFrame({'stime': [1.0, 2.0, 4.0, 6.0], 'etime': [1.5, 3.5, 4.2, 6.5],
+                       'xpos': [5, 5, 25, 25], 'ypos': [5, 5, 5, 5], 'time': [1.0, 2.0, 4.0, 6.0]})
+    aoi_index = AOIGridIndex(AOI_DEFINITIONS, (10, 40))
+    epochs, epoched = epoch_data(df, 0.5, 5.0)
+    
+    metrics, transitions = scanpath_metrics(epoched, aoi_index, epochs=epochs)
+    
+    assert np.allclose(metrics['dwell_time'], [2.0, 0.2]), 'Fixation dwell times are incorrect.'
+    assert metrics['first_visit_latency'].tolist() == [0.5, 3.5], 'Latencies should start at the window.'
+    assert transitions[0, 0, 1] == 1, 'Transitions are incorrect.'
+    
+    with pytest.raises(ValueError, match='aoi_index should be an AOIGridIndex'):
+        scanpath_metrics(df, AOI_DEFINITIONS)
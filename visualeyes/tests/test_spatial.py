@@ -0,0 +1,64 @@
+"""Testing the AOI spatial index in visualeyes.core.spatial.py"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from visualeyes import AOIGridIndex, label_aoi, aoi_hits
+
+def test_run_correctly():
+    """
+    Smoke test of whether the index labels data points correctly
+    """
+    aoi_definitions = [{'shape': 'rectangle', 'coordinates': (0, 10, 0, 10)},
+                       {'shape': 'circle', 'coordinates': (30, 30, 5)},
+                       {'shape': 'rectangle', 'coordinates': (5, 15, 5, 15)}]
+    aoi_index = AOIGridIndex(aoi_definitions, (50, 50))
+    
+    df = pd.DataFrame({'xpos': [1, 30, 12, 40, np.nan, 7], 'ypos': [1, 31, 12, 45, 3, 7]})
+    labels = label_aoi(df, aoi_index)
+    
+    # the point at (7, 7) is in both rectangles, the first definition wins
+    assert labels.tolist() == [0, 1, 2, -1, -1, 0], 'AOI labels are incorrect.'
+    
+    # overlapping AOIs each count a shared point
+    assert aoi_index.counts(df['xpos'], df['ypos']).tolist() == [2, 1, 2], 'AOI counts are incorrect.'
+    
+    return None
+
+@pytest.mark.parametrize('cell_size', [None, 1, 7, 64])
+def test_matches_brute_force(cell_size):
+    """
+    Check that the index agrees with testing every data point against every AOI
+    """
+    screen_dimensions = (120, 160)
+    rng = np.random.default_rng(1)
+    
+    aoi_definitions = []
+    for _ in range(40):
+        x, y = rng.integers(15, 145), rng.integers(15, 105)
+        aoi_definitions.append({'shape': 'rectangle', 'coordinates': (x - 10, x + 5, y - 8, y + 3)})
+        aoi_definitions.append({'shape': 'circle', 'coordinates': (x, y, 6)})
+        aoi_definitions.append({'shape': 'ellipse', 'coordinates': (x, y, 9, 4, 25)})
+        aoi_definitions.append({'shape': 'polygon', 'coordinates': [(x - 12, y), (x, y - 12), (x + 12, y + 12)]})
+    
+    df = pd.DataFrame({'xpos': rng.uniform(-10, 170, 5000), 'ypos': rng.uniform(-10, 130, 5000)})
+    
+    aoi_index = AOIGridIndex(aoi_definitions, screen_dimensions, cell_size=cell_size)
+    point_indices, aoi_indices = aoi_index.hits(df['xpos'], df['ypos'])
+    
+    hits = np.zeros((len(df), len(aoi_definitions)), dtype=bool)
+    hits[point_indices, aoi_indices] = True
+    
+    assert np.array_equal(hits, aoi_hits(df, aoi_definitions, screen_dimensions)), 'AOI hits are incorrect.'
+    
+    return None
+
+def test_invalid_input():
+    """
+    One shot test of whether the index raises errors for invalid input
+    """
+    with pytest.raises(ValueError, match='cell_size should be a positive integer'):
+        AOIGridIndex({'shape': 'circle', 'coordinates': (5, 5, 2)}, (10, 10), cell_size=0)
+    
+    with pytest.raises(ValueError, match='aoi_index should be an AOIGridIndex'):
+        label_aoi(pd.DataFrame({'xpos': [1], 'ypos': [1]}), None)
@@ -4,7 +4,8 @@ import numpy as np
 import pandas as pd
 import pytest
 from visualeyes.core._utility import (aoi_mask_validation, dataframe_validation,
-                                        aoi_definitions_validation, screen_dimensions_validation)
+                                        aoi_definitions_validation, screen_dimensions_validation,
+                                        bins_validation)
 
 def test_aoi_mask_validation():
     
@@ -72,6 +73,25 @@ def test_aoi_definitions_validation():
     aoi_def = {'shape': 'circle', 'coordinates': (50, 50, 10)}
     assert aoi_definitions_validation(aoi_def, screen_dimensions) is None
 
+    # Valid ellipse AOI, with and without rotation
+    aoi_def = [{'shape': 'ellipse', 'coordinates': (50, 50, 20, 10)},
+               {'shape': 'ellipse', 'coordinates': (50, 50, 20, 10, 45.5)}]
+    assert aoi_definitions_validation(aoi_def, screen_dimensions) is None
+
+    # Valid polygon AOI
+    aoi_def = {'shape': 'polygon', 'coordinates': [(10, 10), (50, 20), (30, 60)]}
+    assert aoi_definitions_validation(aoi_def, screen_dimensions) is None
+
+    # Polygon with too few vertices
+    aoi_def = {'shape': 'polygon', 'coordinates': [(10, 10), (50, 20)]}
+    with pytest.raises(ValueError, match='Polygon coordinates should have at least three vertices'):
+        aoi_definitions_validation(aoi_def, screen_dimensions)
+
+    # Rotated ellipse exceeding boundaries
+    aoi_def = {'shape': 'ellipse', 'coordinates': (50, 15, 40, 10, 90)}
+    with pytest.raises(ValueError, match='AOI exceeds screen boundaries'):
+        aoi_definitions_validation(aoi_def, screen_dimensions)
+
     # Missing keys
     aoi_def = {'shape': 'rectangle'}
     with pytest.raises(KeyError, match='Missing keys in AOI definition'):
@@ -114,3 +134,21 @@ def test_screen_dimensions_validation():
     with pytest.raises(ValueError, match='Screen dimensions should have positive integer values'):
         screen_dimensions_validation((100, -200))
 
+def test_bins_validation():
+    
+    """
+    One shot tests for bins_validation function.
+    """
+    
+    # Default, integer and tuple bins
+    assert bins_validation(None, (100, 200)) == (20, 10)
+    assert bins_validation(5, (100, 200)) == (5, 5)
+    assert bins_validation((8, 4), (100, 200)) == (8, 4)
+    
+    # Invalid bins
+    with pytest.raises(ValueError, match='`bins` must be an integer or a tuple of two integers'):
+        bins_validation((8, 4, 2), (100, 200))
+    with pytest.raises(ValueError, match='`bins` must be an integer or a tuple of two integers'):
+        bins_validation((8.5, 4), (100, 200))
+    with pytest.raises(ValueError, match='bins should be positive'):
+        bins_validation(0, (100, 200))